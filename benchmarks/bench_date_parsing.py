@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark Dutch date parsing: the previous per-call parse_event_date()
+(regexes rebuilt, datetime.now() per row) vs the batch parse_event_dates().
+Input strings are sampled from the date column of the committed venue CSVs.
+
+Usage:
+  python benchmarks/bench_date_parsing.py [--samples 20000] [--repeat 5]
+"""
+
+import argparse
+import csv
+import random
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from cultural_venues_scraper.dates import DUTCH_MONTHS, parse_event_dates
+
+
+def legacy_parse_event_date(date_str):
+    """parse_event_date() as it was in supabase_writer.py before the dates module."""
+    if not date_str or not isinstance(date_str, str):
+        return None
+    s = date_str.strip().lower()
+    if s.startswith("vandaag") or s == "today":
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    m = re.search(r"(\d{1,2})\s+([a-z]{3,9})\.?\s*(?:,|\s+)(\d{4})?", s)
+    if m:
+        day = int(m.group(1))
+        mon_str = m.group(2)[:3]
+        year_str = m.group(3)
+        year = int(year_str) if year_str else None
+        month = DUTCH_MONTHS.get(mon_str)
+        if not month:
+            return None
+        if year is None:
+            now = datetime.now(timezone.utc)
+            year = now.year
+            try:
+                dt = datetime(year, month, day)
+                if dt.date() < now.date():
+                    year += 1
+            except (ValueError, TypeError):
+                pass
+        try:
+            dt = datetime(year, month, day)
+            return dt.strftime("%Y-%m-%d")
+        except (ValueError, TypeError):
+            pass
+    m2 = re.search(r"(\d{1,2})\s+([a-z]{3,9})\s+(\d{4})", s)
+    if m2:
+        day = int(m2.group(1))
+        mon_str = m2.group(2)[:3]
+        year = int(m2.group(3))
+        month = DUTCH_MONTHS.get(mon_str)
+        if month:
+            try:
+                dt = datetime(year, month, day)
+                return dt.strftime("%Y-%m-%d")
+            except (ValueError, TypeError):
+                pass
+    return None
+
+
+def load_date_strings():
+    values = []
+    for path in sorted((ROOT / "cultural_venues_scraper").glob("*/events.csv")):
+        with open(path, encoding="utf-8", newline="") as f:
+            values.extend(row.get("date", "") for row in csv.DictReader(f))
+    return values
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=20000, help="date strings to parse per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per implementation (best is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    population = load_date_strings()
+    if not population:
+        print("No venue events.csv files found")
+        return 1
+    sample = random.Random(args.seed).choices(population, k=args.samples)
+    print(f"{len(sample)} strings sampled from {len(population)} ({len(set(population))} distinct)")
+
+    legacy_time, legacy = best_of(args.repeat, lambda: [legacy_parse_event_date(s) for s in sample])
+    # A fresh parser per run, so every run starts with a cold cache
+    today = datetime.now(timezone.utc).date()
+    batch_time, (dates, reasons) = best_of(args.repeat, lambda: parse_event_dates(sample, today=today))
+
+    mismatches = sum(1 for a, b in zip(legacy, dates) if a != b)
+    rejected = sum(1 for r in reasons if r)
+    print(f"legacy per-call : {legacy_time * 1000:8.1f} ms  ({len(sample) / legacy_time:,.0f} strings/s)")
+    print(f"batch           : {batch_time * 1000:8.1f} ms  ({len(sample) / batch_time:,.0f} strings/s)")
+    print(f"speedup         : {legacy_time / batch_time:8.1f}x")
+    print(f"rejected        : {rejected}  mismatches vs legacy: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
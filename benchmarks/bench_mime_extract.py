@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark newsletter text extraction on saved Gmail messages.
+Compares the old extract_text_from_email() (decode every text part, BeautifulSoup
+parse, per-anchor replace_with) with the single-pass MIME walker and streaming
+html_to_text() used now, and checks both produce the same text.
+
+Usage:
+  python benchmarks/bench_mime_extract.py --record 20   # save 20 recent newsletters (format=full)
+  python benchmarks/bench_mime_extract.py               # replay saved messages
+"""
+
+import argparse
+import base64
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extract_events
+from cultural_venues_scraper.parsing import make_soup
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "newsletters"
+
+
+def legacy_extract_text(msg):
+    """Previous extract_text_from_email()."""
+    payload = msg.get("payload", {})
+    parts_to_check = payload["parts"] if "parts" in payload else [payload]
+    html_parts = []
+    text_parts = []
+
+    def walk_parts(parts):
+        for part in parts:
+            mime = part.get("mimeType", "")
+            if "parts" in part:
+                walk_parts(part["parts"])
+            elif mime == "text/html":
+                data = part.get("body", {}).get("data", "")
+                if data:
+                    html_parts.append(base64.urlsafe_b64decode(data).decode("utf-8", errors="replace"))
+            elif mime == "text/plain":
+                data = part.get("body", {}).get("data", "")
+                if data:
+                    text_parts.append(base64.urlsafe_b64decode(data).decode("utf-8", errors="replace"))
+
+    walk_parts(parts_to_check)
+    if html_parts:
+        soup = make_soup("\n".join(html_parts))
+        for tag in soup(["script", "style"]):
+            tag.decompose()
+        for a in soup.find_all("a", href=True):
+            href = a["href"]
+            link_text = a.get_text(strip=True)
+            if href and href.startswith("http"):
+                a.replace_with(f"{link_text} ({href})")
+        return soup.get_text(separator="\n", strip=True)
+    return "\n".join(text_parts)
+
+
+def record(count, fixtures_dir):
+    creds = extract_events.get_google_creds()
+    gmail = extract_events.build("gmail", "v1", credentials=creds)
+    ids = extract_events.list_message_ids(gmail, "in:inbox")[:count]
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    for msg in extract_events.fetch_messages(gmail, ids):
+        path = fixtures_dir / f"{msg['id']}.json"
+        path.write_text(json.dumps(msg), encoding="utf-8")
+        print(f"Saved {path} ({path.stat().st_size} bytes)")
+
+
+def bench(fixtures_dir, repeat):
+    paths = sorted(fixtures_dir.glob("*.json"))
+    if not paths:
+        print(f"No fixtures in {fixtures_dir} — run with --record first")
+        return 1
+
+    print(f"{'message':<20}{'KB':>8}{'legacy ms':>12}{'stream ms':>12}{'speedup':>10}")
+    total_legacy = total_stream = 0.0
+    for path in paths:
+        msg = json.loads(path.read_text(encoding="utf-8"))
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            old = legacy_extract_text(msg)
+        legacy = (time.perf_counter() - t0) / repeat
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            new = extract_events.extract_text_from_email(msg)
+        stream = (time.perf_counter() - t0) / repeat
+
+        if old != new:
+            print(f"  WARNING: {path.name}: extracted text differs ({len(old)} vs {len(new)} chars)")
+        total_legacy += legacy
+        total_stream += stream
+        speedup = legacy / stream if stream else float("inf")
+        size = path.stat().st_size / 1024
+        print(f"{path.stem[:19]:<20}{size:>8.0f}{legacy * 1000:>12.2f}{stream * 1000:>12.2f}{speedup:>9.1f}x")
+
+    speedup = total_legacy / total_stream if total_stream else float("inf")
+    print(f"{'total':<20}{'':>8}{total_legacy * 1000:>12.2f}{total_stream * 1000:>12.2f}{speedup:>9.1f}x")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", type=int, metavar="COUNT", help="download and save this many newsletters")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR, help="directory of saved messages")
+    parser.add_argument("--repeat", type=int, default=10, help="timing repetitions per message")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.fixtures)
+        return 0
+    return bench(args.fixtures, args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
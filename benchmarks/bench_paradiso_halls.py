@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark Paradiso hall lookup on saved podiuminfo.nl listing pages.
+Compares the old per-event document scan (soup.find per JSON-LD event)
+with the single-pass URL -> hall index used by parse_listing().
+
+Usage:
+  python benchmarks/bench_paradiso_halls.py --record 5   # save the first 5 listing pages
+  python benchmarks/bench_paradiso_halls.py              # replay saved pages
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cultural_venues_scraper import fetch
+from cultural_venues_scraper.paradiso import scraper as paradiso
+from cultural_venues_scraper.parsing import make_soup
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "paradiso"
+
+
+def legacy_hall_lookup(soup, event_url):
+    """Previous extract_hall_from_html(): one document scan per event."""
+    link = soup.find("a", href=event_url)
+    if not link:
+        return ""
+    row = link.find_parent("section", class_="concert_rows_info")
+    if not row:
+        return ""
+    td4 = row.find("div", class_="td_4_1")
+    if td4:
+        return re.sub(r"\s+", " ", td4.get_text(strip=True))
+    return ""
+
+
+def event_urls(soup):
+    urls = []
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string)
+        except (json.JSONDecodeError, TypeError):
+            continue
+        if isinstance(data, dict) and data.get("@type") == "MusicEvent":
+            urls.append(data.get("url", ""))
+    return urls
+
+
+def record(pages, fixtures_dir):
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    for page in range(pages):
+        if page == 0:
+            url = paradiso.LISTING_URL
+        else:
+            url = f"{paradiso.BASE_URL}/podium/2/concerten/{page}/Paradiso/Amsterdam/"
+        r = fetch.get(url, cache=False)
+        if r.status_code != 200:
+            print(f"{url}: HTTP {r.status_code}, stopping")
+            break
+        path = fixtures_dir / f"page_{page:02d}.html"
+        path.write_text(r.text, encoding="utf-8")
+        print(f"Saved {path} ({len(r.text)} chars)")
+        time.sleep(0.5)
+
+
+def bench(fixtures_dir, repeat):
+    pages = sorted(fixtures_dir.glob("*.html"))
+    if not pages:
+        print(f"No fixtures in {fixtures_dir} — run with --record first")
+        return 1
+
+    print(f"{'page':<16}{'events':>8}{'scan ms':>12}{'index ms':>12}{'speedup':>10}")
+    total_scan = total_index = 0.0
+    for path in pages:
+        soup = make_soup(path.read_text(encoding="utf-8"), parse_only=paradiso.LISTING_STRAINER)
+        urls = event_urls(soup)
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            scanned = [legacy_hall_lookup(soup, u) for u in urls]
+        scan = (time.perf_counter() - t0) / repeat
+
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            halls = paradiso.build_hall_index(soup)
+            indexed = [halls.get(u, "") for u in urls]
+        index = (time.perf_counter() - t0) / repeat
+
+        if scanned != indexed:
+            print(f"  WARNING: {path.name}: hall names differ between scan and index")
+        total_scan += scan
+        total_index += index
+        speedup = scan / index if index else float("inf")
+        print(f"{path.name:<16}{len(urls):>8}{scan * 1000:>12.2f}{index * 1000:>12.2f}{speedup:>9.1f}x")
+
+    speedup = total_scan / total_index if total_index else float("inf")
+    print(f"{'total':<16}{'':>8}{total_scan * 1000:>12.2f}{total_index * 1000:>12.2f}{speedup:>9.1f}x")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", type=int, metavar="PAGES", help="fetch and save this many listing pages")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR, help="directory of saved listing pages")
+    parser.add_argument("--repeat", type=int, default=20, help="timing repetitions per page")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.fixtures)
+        return 0
+    return bench(args.fixtures, args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
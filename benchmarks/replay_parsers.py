@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Replay saved venue responses through each scraper's parser, offline.
+Records real listing pages (plus De Kleine Komedie detail pages and the De Balie
+wp-json responses) once, then times the same parsing scrape_all does after each
+fetch and reports, per venue, events per second, the tracemalloc peak and the
+memory blocks still held by the parsed events.
+
+Usage:
+  python benchmarks/replay_parsers.py --record                     # save 3 pages + 10 details per venue
+  python benchmarks/replay_parsers.py                              # replay all venues
+  python benchmarks/replay_parsers.py paradiso de_balie --repeat 50
+  python benchmarks/replay_parsers.py --save baseline.json         # keep the numbers
+  python benchmarks/replay_parsers.py --compare baseline.json      # exit 1 on a regression
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cultural_venues_scraper import fetch
+from cultural_venues_scraper.concertgebouw import scraper as concertgebouw
+from cultural_venues_scraper.de_balie import scraper as de_balie
+from cultural_venues_scraper.de_kleine_komedie import scraper as de_kleine_komedie
+from cultural_venues_scraper.pakhuis_de_zwijger import scraper as pakhuis_de_zwijger
+from cultural_venues_scraper.paradiso import scraper as paradiso
+from cultural_venues_scraper.parsing import make_soup
+from cultural_venues_scraper.rode_hoed import scraper as rode_hoed
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "replay"
+
+
+# --- Recording: the URLs each scraper's iter_events() walks ---
+
+def save_pages(venue_dir, prefix, urls, suffix):
+    """Fetch urls in order (bypassing the HTTP cache) until one fails; returns the saved texts."""
+    venue_dir.mkdir(parents=True, exist_ok=True)
+    texts = []
+    for i, url in enumerate(urls):
+        r = fetch.get(url, cache=False)
+        if r.status_code != 200:
+            print(f"  {url}: HTTP {r.status_code}, stopping")
+            break
+        path = venue_dir / f"{prefix}_{i:02d}{suffix}"
+        path.write_text(r.text, encoding="utf-8")
+        print(f"  saved {path} ({len(r.text)} chars)")
+        texts.append(r.text)
+        time.sleep(0.5)
+    return texts
+
+
+def record_concertgebouw(venue_dir, pages, details):
+    urls = [f"{concertgebouw.AGENDA_URL}?page={page}" for page in range(1, pages + 1)]
+    save_pages(venue_dir, "listing", urls, ".html")
+
+
+def record_pakhuis_de_zwijger(venue_dir, pages, details):
+    now = datetime.now()
+    urls = [pakhuis_de_zwijger.AGENDA_URL]
+    for i in range(1, pages):
+        m = now.month + i
+        y = now.year + (m - 1) // 12
+        m = ((m - 1) % 12) + 1
+        urls.append(f"{pakhuis_de_zwijger.AGENDA_URL}/start/{y}/{m:02d}")
+    save_pages(venue_dir, "listing", urls, ".html")
+
+
+def record_de_kleine_komedie(venue_dir, pages, details):
+    urls = [f"{de_kleine_komedie.AGENDA_URL}?page={page}" for page in range(1, pages + 1)]
+    events = []
+    for text in save_pages(venue_dir, "listing", urls, ".html"):
+        events.extend(parse_de_kleine_komedie(text, venue_dir))
+    save_pages(venue_dir, "detail", [e.url for e in events[:details]], ".html")
+
+
+def record_de_balie(venue_dir, pages, details):
+    save_pages(venue_dir, "categories", [f"{de_balie.CATEGORY_URL}?per_page=100"], ".json")
+    urls = [f"{de_balie.API_URL}?per_page=100&page={page}" for page in range(1, pages + 1)]
+    save_pages(venue_dir, "listing", urls, ".json")
+
+
+def record_rode_hoed(venue_dir, pages, details):
+    save_pages(venue_dir, "listing", [rode_hoed.AGENDA_URL], ".html")
+
+
+def record_paradiso(venue_dir, pages, details):
+    urls = [paradiso.LISTING_URL]
+    urls += [f"{paradiso.BASE_URL}/podium/2/concerten/{page}/Paradiso/Amsterdam/" for page in range(1, pages)]
+    save_pages(venue_dir, "listing", urls, ".html")
+
+
+RECORDERS = {
+    "concertgebouw": record_concertgebouw,
+    "pakhuis_de_zwijger": record_pakhuis_de_zwijger,
+    "de_kleine_komedie": record_de_kleine_komedie,
+    "de_balie": record_de_balie,
+    "rode_hoed": record_rode_hoed,
+    "paradiso": record_paradiso,
+}
+
+
+# --- Replay: what each scraper does with a response body ---
+
+def parse_concertgebouw(text, venue_dir):
+    return concertgebouw.parse_events_from_page(make_soup(text))
+
+
+def parse_pakhuis_de_zwijger(text, venue_dir):
+    soup = make_soup(text, parse_only=pakhuis_de_zwijger.LISTING_STRAINER)
+    return pakhuis_de_zwijger.parse_events_from_page(soup)
+
+
+def parse_de_kleine_komedie(text, venue_dir):
+    soup = make_soup(text, parse_only=de_kleine_komedie.LISTING_STRAINER)
+    return de_kleine_komedie.parse_events_from_page(soup)
+
+
+def parse_de_kleine_komedie_detail(text, venue_dir):
+    summary = de_kleine_komedie.summarize_detail(de_kleine_komedie.parse_detail_page(text))
+    return [summary] if summary else []
+
+
+@lru_cache(maxsize=None)
+def de_balie_categories(venue_dir):
+    path = venue_dir / "categories_00.json"
+    if not path.exists():
+        return {}
+    return de_balie.parse_categories(json.loads(path.read_text(encoding="utf-8")))
+
+
+def parse_de_balie(text, venue_dir):
+    return de_balie.parse_items(json.loads(text), de_balie_categories(venue_dir))
+
+
+def parse_rode_hoed(text, venue_dir):
+    return rode_hoed.parse_events_from_page(make_soup(text, parse_only=rode_hoed.LISTING_STRAINER))
+
+
+def parse_paradiso(text, venue_dir):
+    return paradiso.parse_listing(text)
+
+
+# (label, venue, fixture glob, parse(text, venue_dir) -> parsed items)
+CASES = [
+    ("concertgebouw", "concertgebouw", "listing_*.html", parse_concertgebouw),
+    ("pakhuis_de_zwijger", "pakhuis_de_zwijger", "listing_*.html", parse_pakhuis_de_zwijger),
+    ("de_kleine_komedie", "de_kleine_komedie", "listing_*.html", parse_de_kleine_komedie),
+    ("de_kleine_komedie/detail", "de_kleine_komedie", "detail_*.html", parse_de_kleine_komedie_detail),
+    ("de_balie", "de_balie", "listing_*.json", parse_de_balie),
+    ("rode_hoed", "rode_hoed", "listing_*.html", parse_rode_hoed),
+    ("paradiso", "paradiso", "listing_*.html", parse_paradiso),
+]
+
+
+def measure(parse, documents, venue_dir, repeat):
+    """Time `repeat` passes over the documents, then trace one more pass for memory."""
+    for text in documents:  # warm-up: lazy imports, regex and date parser caches
+        parse(text, venue_dir)
+
+    events = 0
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for text in documents:
+            events += len(parse(text, venue_dir))
+    elapsed = time.perf_counter() - t0
+
+    gc.collect()
+    tracemalloc.start()
+    parsed = [parse(text, venue_dir) for text in documents]
+    _, peak = tracemalloc.get_traced_memory()
+    # Soup trees are reference cycles: collect them so only what the events hold is counted
+    gc.collect()
+    stats = tracemalloc.take_snapshot().statistics("filename")
+    tracemalloc.stop()
+    del parsed
+
+    return {
+        "documents": len(documents),
+        "events": events // repeat,
+        "ms_per_pass": elapsed / repeat * 1000,
+        "events_per_sec": events / elapsed if elapsed else 0.0,
+        "peak_kib": peak / 1024,
+        "kept_kib": sum(s.size for s in stats) / 1024,
+        "kept_blocks": sum(s.count for s in stats),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print regressions against a saved run; returns True if there were any."""
+    regressed = False
+    for label, r in results.items():
+        base = baseline.get(label)
+        if not base:
+            continue
+        checks = [
+            ("events/s", r["events_per_sec"] < base["events_per_sec"] * (1 - tolerance),
+             base["events_per_sec"], r["events_per_sec"]),
+            ("peak KiB", r["peak_kib"] > base["peak_kib"] * (1 + tolerance), base["peak_kib"], r["peak_kib"]),
+            ("blocks", r["kept_blocks"] > base["kept_blocks"] * (1 + tolerance),
+             base["kept_blocks"], r["kept_blocks"]),
+        ]
+        for name, worse, old, new in checks:
+            if worse:
+                regressed = True
+                print(f"  REGRESSION {label}: {name} {old:.0f} -> {new:.0f}")
+    return regressed
+
+
+def bench(venues, fixtures_dir, repeat):
+    results = {}
+    print(f"{'venue':<26}{'docs':>6}{'events':>8}{'ms/pass':>10}{'events/s':>11}"
+          f"{'peak KiB':>10}{'kept KiB':>10}{'blocks':>9}")
+    for label, venue, pattern, parse in CASES:
+        if venue not in venues:
+            continue
+        venue_dir = fixtures_dir / venue
+        paths = sorted(venue_dir.glob(pattern))
+        if not paths:
+            print(f"{label:<26}  no fixtures in {venue_dir} — run with --record first")
+            continue
+        documents = [path.read_text(encoding="utf-8") for path in paths]
+        r = measure(parse, documents, venue_dir, repeat)
+        results[label] = r
+        print(f"{label:<26}{r['documents']:>6}{r['events']:>8}{r['ms_per_pass']:>10.2f}{r['events_per_sec']:>11.0f}"
+              f"{r['peak_kib']:>10.0f}{r['kept_kib']:>10.0f}{r['kept_blocks']:>9}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("venues", nargs="*", metavar="VENUE",
+                        help=f"venues to record/replay (default: all of {', '.join(RECORDERS)})")
+    parser.add_argument("--record", action="store_true", help="fetch and save fixtures instead of replaying")
+    parser.add_argument("--pages", type=int, default=3, help="listing pages to record per venue")
+    parser.add_argument("--details", type=int, default=10, help="De Kleine Komedie detail pages to record")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR, help="directory of saved responses")
+    parser.add_argument("--repeat", type=int, default=20, help="timed passes over each venue's fixtures")
+    parser.add_argument("--save", type=Path, metavar="JSON", help="write the results to this file")
+    parser.add_argument("--compare", type=Path, metavar="JSON", help="compare with results saved by --save")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="relative slowdown / growth reported as a regression (with --compare)")
+    args = parser.parse_args()
+    venues = args.venues or list(RECORDERS)
+    unknown = [venue for venue in venues if venue not in RECORDERS]
+    if unknown:
+        parser.error(f"unknown venue(s): {', '.join(unknown)}")
+
+    if args.record:
+        for venue in venues:
+            print(f"Recording {venue}...")
+            RECORDERS[venue](args.fixtures / venue, args.pages, args.details)
+        return 0
+
+    results = bench(venues, args.fixtures, args.repeat)
+    if not results:
+        return 1
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved results to {args.save}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare(results, baseline, args.tolerance):
+            return 1
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
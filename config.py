@@ -15,6 +15,7 @@ SCOPES = [
 
 # Google Sheets
 GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID", "1NGqCZJggiif_6fQ9huqLk8tx-Kfw89YAdLUIhQkLrUU")
+SHEETS_INDEX_FILE = "sheets_index.json"  # local (title, date) index of rows already in the sheet
 
 # Anthropic
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
@@ -26,3 +27,46 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
 # Pipeline settings
 DAYS_LOOKBACK = int(os.getenv("DAYS_LOOKBACK", "7"))
 PROCESSED_IDS_FILE = "processed_ids.json"
+GMAIL_HISTORY_SYNC = os.getenv("GMAIL_HISTORY_SYNC", "1") == "1"  # list only mail added since the last run
+GMAIL_SYNC_STATE_FILE = "gmail_sync_state.json"
+
+# Venue scraper settings
+SCRAPER_WORKERS = int(os.getenv("SCRAPER_WORKERS", "6"))   # venues scraped concurrently (--parallel)
+SCRAPER_CONNECT_TIMEOUT = float(os.getenv("SCRAPER_CONNECT_TIMEOUT", "5"))  # seconds
+SCRAPER_READ_TIMEOUT = float(os.getenv("SCRAPER_READ_TIMEOUT", "20"))       # seconds
+SCRAPER_RETRIES = int(os.getenv("SCRAPER_RETRIES", "3"))
+SCRAPER_RETRY_BACKOFF = float(os.getenv("SCRAPER_RETRY_BACKOFF", "0.5"))    # 0.5s, 1s, 2s, ...
+SCRAPER_POOL_HOSTS = 10   # hosts kept in the connection pool
+SCRAPER_POOL_SIZE = 10    # keep-alive connections per host
+SCRAPER_HOST_RATE = float(os.getenv("SCRAPER_HOST_RATE", "4"))        # max requests/second per host (throttled fetches)
+SCRAPER_DETAIL_WORKERS = int(os.getenv("SCRAPER_DETAIL_WORKERS", "4"))  # detail pages in flight per venue
+SCRAPER_CACHE_DIR = os.getenv(
+    "SCRAPER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cultural_venues_scraper", ".cache"),
+)
+SCRAPER_HTTP_CACHE = os.getenv("SCRAPER_HTTP_CACHE", "1") == "1"             # conditional GETs via on-disk cache
+SCRAPER_HTTP_CACHE_MAX_MB = int(os.getenv("SCRAPER_HTTP_CACHE_MAX_MB", "200"))
+SCRAPER_HTTP_CACHE_MAX_AGE_DAYS = int(os.getenv("SCRAPER_HTTP_CACHE_MAX_AGE_DAYS", "14"))
+SCRAPER_DETAIL_REFRESH_DAYS = int(os.getenv("SCRAPER_DETAIL_REFRESH_DAYS", "7"))  # max age of reused detail data
+SCRAPER_DETAIL_NEAR_DAYS = int(os.getenv("SCRAPER_DETAIL_NEAR_DAYS", "14"))       # always refresh events this close
+
+# Supabase writes (venue scraper)
+SUPABASE_UPSERT_CHUNK_SIZE = int(os.getenv("SUPABASE_UPSERT_CHUNK_SIZE", "500"))  # rows per upsert request
+SUPABASE_UPSERT_CONCURRENCY = int(os.getenv("SUPABASE_UPSERT_CONCURRENCY", "3"))  # chunk requests in flight
+SUPABASE_UPSERT_RETRIES = int(os.getenv("SUPABASE_UPSERT_RETRIES", "3"))          # attempts per chunk
+SUPABASE_UPSERT_RETRY_BACKOFF = float(os.getenv("SUPABASE_UPSERT_RETRY_BACKOFF", "1"))  # seconds, doubled per retry
+SUPABASE_STREAM_FLUSH_SECONDS = float(os.getenv("SUPABASE_STREAM_FLUSH_SECONDS", "5"))  # flush a partial chunk after this long
+SUPABASE_FINGERPRINT_MAX_AGE_DAYS = int(os.getenv("SUPABASE_FINGERPRINT_MAX_AGE_DAYS", "7"))  # re-diff unchanged rows this often
+
+# Newsletter LLM extraction
+LLM_MODEL = os.getenv("LLM_MODEL", "claude-haiku-4-5-20251001")
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "5"))   # extraction calls in flight
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))   # retries on 429/529/5xx/connection errors
+LLM_CACHE = os.getenv("LLM_CACHE", "1") == "1"                # reuse results for identical emails
+LLM_CACHE_FILE = os.getenv("LLM_CACHE_FILE", "llm_cache.json")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_MAX_AGE_DAYS = int(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "14"))
+LLM_CHUNK_CHARS = int(os.getenv("LLM_CHUNK_CHARS", "12000"))  # longer newsletters are split and extracted in parallel
+LLM_MAX_CHUNKS = int(os.getenv("LLM_MAX_CHUNKS", "8"))         # per email
+LLM_LINK_MAX_LEN = int(os.getenv("LLM_LINK_MAX_LEN", "60"))    # longer URLs are sent as [link N] placeholders
+LLM_BATCH_POLL_SECONDS = float(os.getenv("LLM_BATCH_POLL_SECONDS", "30"))  # --batch status poll interval
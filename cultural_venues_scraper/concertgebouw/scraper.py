@@ -4,18 +4,19 @@ Uses requests + BeautifulSoup (SSR HTML parsing, no browser needed).
 Outputs to events.md and events.csv in this folder.
 """
 
-import requests
-from bs4 import BeautifulSoup
 import re
-import csv
 import time
 import os
 
+from cultural_venues_scraper import fetch, metrics
+from cultural_venues_scraper.event import Event
+from cultural_venues_scraper.writers import CsvSink, MarkdownSink, write_all
+from cultural_venues_scraper.parsing import make_soup
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 BASE_URL = "https://www.concertgebouw.nl"
 AGENDA_URL = f"{BASE_URL}/concerten-en-tickets"
-HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
 
 
 def parse_events_from_page(soup):
@@ -97,77 +98,72 @@ def parse_events_from_page(soup):
         url = BASE_URL + href
         full_date = f"{date}, {time_str}".strip(", ")
 
-        events.append({
-            "title": title,
-            "event_type": event_type,
-            "date": full_date,
-            "hall": hall,
-            "description": desc,
-            "url": url,
-            "price": price,
-        })
+        events.append(Event(
+            title=title,
+            event_type=event_type,
+            date=full_date,
+            hall=hall,
+            description=desc,
+            url=url,
+            price=price,
+        ))
 
     return events
 
 
-def scrape_all_pages():
-    """Scrape all pages of the Concertgebouw agenda."""
-    all_events = []
+def iter_events():
+    """Yield events from all pages of the Concertgebouw agenda as each page is parsed."""
+    total = 0
     page = 1
 
     while True:
         url = f"{AGENDA_URL}?page={page}"
         print(f"Fetching page {page}... ", end="", flush=True)
 
-        r = requests.get(url, headers=HEADERS)
+        r = fetch.get(url)
         if r.status_code != 200:
             print(f"HTTP {r.status_code}, stopping.")
             break
 
-        soup = BeautifulSoup(r.text, "html.parser")
-        events = parse_events_from_page(soup)
+        with metrics.stage("parse"):
+            soup = make_soup(r.text)  # needs link parents, so no strainer
+            events = parse_events_from_page(soup)
 
         if not events:
             print(f"0 events, stopping.")
             break
 
-        all_events.extend(events)
-        print(f"{len(events)} events (total: {len(all_events)})")
+        total += len(events)
+        print(f"{len(events)} events (total: {total})")
+        yield from events
 
         page += 1
         time.sleep(0.5)  # be polite
 
-    return all_events
+
+def scrape_all_pages():
+    """Scrape all pages of the Concertgebouw agenda."""
+    return list(iter_events())
 
 
-def write_markdown(events, filename=None):
+def markdown_sink(filename=None):
     if filename is None:
         filename = os.path.join(SCRIPT_DIR, "events.md")
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write("# Concertgebouw Events - Full Agenda\n\n")
-        f.write(f"Source: {AGENDA_URL}\n\n")
-        f.write(f"Total events: {len(events)}\n\n")
-        f.write("| Event Title | Event Type | Date | Hall | Description | URL | Price |\n")
-        f.write("|---|---|---|---|---|---|---|\n")
-        for e in events:
-            desc = (e["description"][:80] + "...") if len(e["description"]) > 80 else e["description"]
-            f.write(
-                f'| {e["title"]} | {e["event_type"]} | {e["date"]} '
-                f'| {e["hall"]} | {desc} | [Link]({e["url"]}) | {e["price"]} |\n'
-            )
-    print(f"Written {filename}")
+    return MarkdownSink(filename, "Concertgebouw Events - Full Agenda", AGENDA_URL)
 
 
-def write_csv(events, filename=None):
+def csv_sink(filename=None):
     if filename is None:
         filename = os.path.join(SCRIPT_DIR, "events.csv")
-    with open(filename, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f, fieldnames=["title", "event_type", "date", "hall", "description", "url", "price"]
-        )
-        writer.writeheader()
-        writer.writerows(events)
-    print(f"Written {filename}")
+    return CsvSink(filename)
+
+
+def write_markdown(events, filename=None):
+    write_all(markdown_sink(filename), events)
+
+
+def write_csv(events, filename=None):
+    write_all(csv_sink(filename), events)
 
 
 if __name__ == "__main__":
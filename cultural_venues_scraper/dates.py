@@ -0,0 +1,129 @@
+"""
+Dutch venue date parsing.
+Patterns are compiled once, "today" is snapshotted once per parser (i.e. per run),
+and results are memoized per input string — venues repeat the same date text
+for every event on a given day.
+"""
+
+import re
+from datetime import date, datetime, timezone
+
+# Dutch month abbreviations -> month number
+DUTCH_MONTHS = {
+    "jan": 1, "feb": 2, "mrt": 3, "mar": 3, "apr": 4, "mei": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "okt": 10, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# DD + month (abbrev or full) + optional dot + optional YYYY
+# e.g. "do 12 feb 2026", "12 feb. 2026", "ma 16 feb, 19.30", "wo 18 feb, 19.30 uur"
+DATE_RE = re.compile(r"(\d{1,2})\s+([a-z]{3,9})\.?\s*(?:,|\s+)(\d{4})?")
+# Fallback: DD month YYYY with space (no comma), e.g. "vr 13 februari 2026"
+DATE_WITH_YEAR_RE = re.compile(r"(\d{1,2})\s+([a-z]{3,9})\s+(\d{4})")
+
+# Rejection reasons returned alongside a None date
+EMPTY = "empty"
+NO_DATE = "no_date"
+UNKNOWN_MONTH = "unknown_month"
+INVALID_DATE = "invalid_date"
+
+
+class DutchDateParser:
+    """Parse date strings to YYYY-MM-DD relative to a fixed `today`."""
+
+    def __init__(self, today: date | None = None, cache_size: int = 8192):
+        self.today = today or datetime.now(timezone.utc).date()
+        self.cache_size = cache_size
+        self._cache = {}
+
+    def parse(self, date_str) -> tuple[str | None, str | None]:
+        """Return (YYYY-MM-DD, None) or (None, rejection reason)."""
+        if not date_str or not isinstance(date_str, str):
+            return None, EMPTY
+        result = self._cache.get(date_str)
+        if result is None:
+            result = self._parse(date_str)
+            if len(self._cache) < self.cache_size:
+                self._cache[date_str] = result
+        return result
+
+    def parse_many(self, values) -> tuple[list[str | None], list[str | None]]:
+        """Parse a batch; returns (dates, reasons) aligned with `values`."""
+        dates = []
+        reasons = []
+        parse = self.parse
+        for value in values:
+            parsed, reason = parse(value)
+            dates.append(parsed)
+            reasons.append(reason)
+        return dates, reasons
+
+    def _parse(self, date_str: str) -> tuple[str | None, str | None]:
+        s = date_str.strip().lower()
+
+        # "Vandaag" / "today" -> today
+        if s.startswith("vandaag") or s == "today":
+            return self.today.isoformat(), None
+
+        m = DATE_RE.search(s)
+        if not m:
+            return None, NO_DATE
+
+        day = int(m.group(1))
+        month = DUTCH_MONTHS.get(m.group(2)[:3])
+        if not month:
+            return None, UNKNOWN_MONTH
+        year = int(m.group(3)) if m.group(3) else None
+        if year is None:
+            # No year: assume the upcoming occurrence
+            year = self.today.year
+            try:
+                if date(year, month, day) < self.today:
+                    year += 1
+            except ValueError:
+                pass
+        try:
+            return date(year, month, day).isoformat(), None
+        except ValueError:
+            pass
+
+        m2 = DATE_WITH_YEAR_RE.search(s)
+        if m2:
+            month = DUTCH_MONTHS.get(m2.group(2)[:3])
+            if month:
+                try:
+                    return date(int(m2.group(3)), month, int(m2.group(1))).isoformat(), None
+                except ValueError:
+                    pass
+        return None, INVALID_DATE
+
+
+_default_parser = None
+
+
+def start_run(today: date | None = None) -> DutchDateParser:
+    """Snapshot "today" for a new run and return the parser get_parser() hands out from now on."""
+    global _default_parser
+    _default_parser = DutchDateParser(today)
+    return _default_parser
+
+
+def get_parser() -> DutchDateParser:
+    """Shared parser of the current run; "today" is read once, by the first call or start_run()."""
+    if _default_parser is None:
+        return start_run()
+    return _default_parser
+
+
+def parse_event_date(date_str: str) -> str | None:
+    """
+    Parse Dutch date string to YYYY-MM-DD.
+    Supports: "di 10 feb 2026", "10 feb. 2026", "ma 16 feb, 19.30" (year inferred), "Vandaag".
+    Returns None if parsing fails.
+    """
+    return get_parser().parse(date_str)[0]
+
+
+def parse_event_dates(values, today: date | None = None) -> tuple[list[str | None], list[str | None]]:
+    """Parse many date strings with one 'today' snapshot; returns (dates, rejection reasons)."""
+    parser = DutchDateParser(today) if today else get_parser()
+    return parser.parse_many(values)
@@ -2,41 +2,66 @@
 Scrape all events from De Kleine Komedie agenda.
 Uses requests + BeautifulSoup (SSR HTML parsing).
 Pagination: ?page=N (8 events per page).
-Also fetches detail pages for price + description via JSON-LD.
+Also fetches detail pages for price + description via JSON-LD, concurrently
+with listing pagination (bounded worker pool, per-host rate limit).
+Detail data is remembered per URL; only new, stale, near-date or
+limited-availability events are fetched again.
 Outputs to events.md and events.csv in this folder.
 """
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 import re
-import csv
 import json
-import time
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import config
+from cultural_venues_scraper import fetch, metrics
+from cultural_venues_scraper.dates import get_parser
+from cultural_venues_scraper.event import Event
+from cultural_venues_scraper.writers import CsvSink, MarkdownSink, write_all
+from cultural_venues_scraper.parsing import JSON_LD, make_soup
+from cultural_venues_scraper.enrichment_store import EnrichmentStore
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_URL = "https://www.dekleinekomedie.nl"
 AGENDA_URL = f"{BASE_URL}/agenda"
-HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
 VENUE_NAME = "De Kleine Komedie"
+DETAIL_WORKERS = config.SCRAPER_DETAIL_WORKERS
+HOST_RATE = config.SCRAPER_HOST_RATE  # requests/second shared by listing + detail fetches
+DETAIL_REFRESH_DAYS = config.SCRAPER_DETAIL_REFRESH_DAYS  # re-read detail pages at least this often
+DETAIL_NEAR_DAYS = config.SCRAPER_DETAIL_NEAR_DAYS        # always re-read events this close to their date
+DETAIL_STORE_FILE = os.path.join(config.SCRAPER_CACHE_DIR, "enrichment", "de_kleine_komedie.json")
+
+# Only the event cards are parsed from listing pages. Strainers see the raw class
+# attribute, so match eventCard as one word of it.
+LISTING_STRAINER = SoupStrainer("li", class_=re.compile(r"(^|\s)eventCard(\s|$)"))
+
+
+def parse_detail_page(html):
+    """Return the Event JSON-LD object of an event detail page ({} if there is none)."""
+    soup = make_soup(html, parse_only=JSON_LD)
+    for script in soup.find_all("script", type="application/ld+json"):
+        content = script.string
+        if content and '"Event"' in content:
+            data = json.loads(content)
+            if isinstance(data, list):
+                data = data[0]
+            if data.get("@type") == "Event":
+                return data
+    return {}
 
 
 def fetch_detail_info(path):
-    """Fetch price and description from event detail page JSON-LD."""
+    """Fetch the Event JSON-LD object from an event detail page ({} on failure)."""
     try:
-        r = requests.get(BASE_URL + path, headers=HEADERS, timeout=10)
+        r = fetch.get(BASE_URL + path, rate=HOST_RATE)
         if r.status_code != 200:
-            return {}, {}
-        soup = BeautifulSoup(r.text, "html.parser")
-        for script in soup.find_all("script", type="application/ld+json"):
-            content = script.string
-            if content and '"Event"' in content:
-                data = json.loads(content)
-                if isinstance(data, list):
-                    data = data[0]
-                if data.get("@type") == "Event":
-                    return data
-        return {}
+            return {}
+        with metrics.stage("parse"):
+            return parse_detail_page(r.text)
     except Exception:
         return {}
 
@@ -102,111 +127,160 @@ def parse_events_from_page(soup):
 
         url = BASE_URL + href
 
-        events.append({
-            "title": title,
-            "event_type": event_type,
-            "date": date_str,
-            "hall": VENUE_NAME,
-            "description": description,
-            "url": url,
-            "price": "",  # filled from detail pages
-            "_path": href,
-        })
+        events.append(Event(
+            title=title,
+            event_type=event_type,
+            date=date_str,
+            hall=VENUE_NAME,
+            description=description,
+            url=url,
+            price="",  # filled from detail pages
+        ))
 
     return events
 
 
-def scrape_all_pages():
-    """Fetch all agenda pages, then enrich with detail page data."""
-    all_events = []
+def summarize_detail(detail):
+    """Reduce detail JSON-LD to the fields apply_detail() uses (what the store keeps)."""
+    if not detail:
+        return {}
+    offers = detail.get("offers", {})
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    return {
+        "price": offers.get("price", ""),
+        "availability": offers.get("availability", ""),
+        "description": detail.get("description", ""),
+    }
+
+
+def fetch_detail_summary(path):
+    return summarize_detail(fetch_detail_info(path))
+
+
+def apply_detail(event, info):
+    """Return the event with price, availability and fallback description merged in from a detail summary."""
+    if not info:
+        return event
+    # Price
+    price = event.price
+    if info.get("price"):
+        price = f"EUR {info['price']}"
+    availability = info.get("availability", "")
+    if "SoldOut" in availability:
+        price += " [UITVERKOCHT]"
+    elif "LimitedAvailability" in availability:
+        price += " [Laatste kaarten]"
+
+    # Better description from JSON-LD if card had none
+    description = event.description or info.get("description") or ""
+    return replace(event, price=price, description=description)
+
+
+def needs_detail_fetch(event, store, today):
+    """True unless the stored detail data is recent and the event is neither close nor scarce."""
+    age = store.age_days(event.url, today)
+    if age is None or age >= DETAIL_REFRESH_DAYS:
+        return True
+    availability = store.get(event.url)["data"].get("availability", "")
+    if "SoldOut" in availability or "LimitedAvailability" in availability:
+        return True
+    if not event.event_date:
+        return True
+    return (event.event_date - today).days <= DETAIL_NEAR_DAYS
+
+
+def iter_events():
+    """
+    Yield all agenda events, enriched from their detail pages, in listing order.
+    Detail fetches are submitted as soon as a listing page is parsed, so they
+    overlap with the remaining pagination; finished events are yielded while
+    later pages are still being fetched.
+    """
     seen_urls = set()
+    pending = deque()  # (event, future or None) in listing order; None = reuse stored data
+    store = EnrichmentStore(DETAIL_STORE_FILE)
+    # The run's "today", as used by the date parser
+    today = get_parser().today
     page = 1
+    done = 0
+
+    def finish(event, future):
+        if future is None:
+            info = store.get(event.url)["data"]
+        else:
+            info = future.result()
+            if info:
+                store.put(event.url, info, today)
+        return apply_detail(event, info)
+
+    with ThreadPoolExecutor(max_workers=DETAIL_WORKERS, thread_name_prefix="dkk-detail") as pool:
+        while True:
+            url = f"{AGENDA_URL}?page={page}"
+            print(f"Fetching listing page {page}... ", end="", flush=True)
+
+            r = fetch.get(url, rate=HOST_RATE)
+            if r.status_code != 200:
+                print(f"HTTP {r.status_code}, stopping.")
+                break
+
+            with metrics.stage("parse"):
+                soup = make_soup(r.text, parse_only=LISTING_STRAINER)
+                events = parse_events_from_page(soup)
+
+            if not events:
+                print("0 events, stopping.")
+                break
+
+            new_events = [e for e in events if e.url not in seen_urls]
+            for e in new_events:
+                seen_urls.add(e.url)
+                if needs_detail_fetch(e, store, today):
+                    pending.append((e, metrics.submit(pool, fetch_detail_summary, e.url[len(BASE_URL):])))
+                else:
+                    pending.append((e, None))
+            print(f"{len(new_events)} events (total: {len(seen_urls)})")
+
+            # Hand on the events whose details are already in, keeping listing order
+            while pending and (pending[0][1] is None or pending[0][1].done()):
+                done += 1
+                yield finish(*pending.popleft())
+
+            page += 1
+
+        print(f"\nCollecting details for {len(pending)} remaining event(s) ({done} already done)...")
+        while pending:
+            done += 1
+            yield finish(*pending.popleft())
+            if done % 10 == 0 or not pending:
+                print(f"  {done}/{len(seen_urls)}")
+
+    store.save(today)
 
-    # Phase 1: collect all events from listing pages
-    while True:
-        url = f"{AGENDA_URL}?page={page}"
-        print(f"Fetching listing page {page}... ", end="", flush=True)
 
-        r = requests.get(url, headers=HEADERS)
-        if r.status_code != 200:
-            print(f"HTTP {r.status_code}, stopping.")
-            break
-
-        soup = BeautifulSoup(r.text, "html.parser")
-        events = parse_events_from_page(soup)
-
-        if not events:
-            print("0 events, stopping.")
-            break
-
-        new_events = [e for e in events if e["url"] not in seen_urls]
-        for e in new_events:
-            seen_urls.add(e["url"])
-        all_events.extend(new_events)
-        print(f"{len(new_events)} events (total: {len(all_events)})")
-
-        page += 1
-        time.sleep(0.5)
-
-    # Phase 2: fetch detail pages for price + richer description
-    print(f"\nFetching {len(all_events)} detail pages for prices...")
-    for i, event in enumerate(all_events):
-        detail = fetch_detail_info(event["_path"])
-        if detail:
-            # Price
-            offers = detail.get("offers", {})
-            if isinstance(offers, list):
-                offers = offers[0] if offers else {}
-            price_val = offers.get("price", "")
-            if price_val:
-                event["price"] = f"EUR {price_val}"
-            availability = offers.get("availability", "")
-            if "SoldOut" in availability:
-                event["price"] += " [UITVERKOCHT]"
-
-            # Better description from JSON-LD if card had none
-            if not event["description"] and detail.get("description"):
-                event["description"] = detail["description"]
-
-        if (i + 1) % 10 == 0 or i == len(all_events) - 1:
-            print(f"  {i+1}/{len(all_events)}")
-        time.sleep(0.3)
-
-    # Remove internal field
-    for e in all_events:
-        e.pop("_path", None)
-
-    return all_events
+def scrape_all_pages():
+    """Fetch all agenda pages and enrich each event from its detail page."""
+    return list(iter_events())
 
 
-def write_markdown(events, filename=None):
+def markdown_sink(filename=None):
     if filename is None:
         filename = os.path.join(SCRIPT_DIR, "events.md")
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(f"# {VENUE_NAME} Events\n\n")
-        f.write(f"Source: {AGENDA_URL}\n\n")
-        f.write(f"Total events: {len(events)}\n\n")
-        f.write("| Event Title | Event Type | Date | Hall | Description | URL | Price |\n")
-        f.write("|---|---|---|---|---|---|---|\n")
-        for e in events:
-            desc = (e["description"][:80] + "...") if len(e["description"]) > 80 else e["description"]
-            f.write(
-                f'| {e["title"]} | {e["event_type"]} | {e["date"]} '
-                f'| {e["hall"]} | {desc} | [Link]({e["url"]}) | {e["price"]} |\n'
-            )
-    print(f"Written {filename}")
+    return MarkdownSink(filename, f"{VENUE_NAME} Events", AGENDA_URL)
 
 
-def write_csv(events, filename=None):
+def csv_sink(filename=None):
     if filename is None:
         filename = os.path.join(SCRIPT_DIR, "events.csv")
-    with open(filename, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f, fieldnames=["title", "event_type", "date", "hall", "description", "url", "price"]
-        )
-        writer.writeheader()
-        writer.writerows(events)
-    print(f"Written {filename}")
+    return CsvSink(filename)
+
+
+def write_markdown(events, filename=None):
+    write_all(markdown_sink(filename), events)
+
+
+def write_csv(events, filename=None):
+    write_all(csv_sink(filename), events)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+"""
+Persistent URL -> enrichment store for detail-page data.
+Lets a scraper reuse what it read from an event's detail page on a previous
+run instead of downloading the page again. One JSON file per venue.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from datetime import date, timedelta
+
+
+class EnrichmentStore:
+    def __init__(self, path: str, max_age_days: int = 60):
+        self.path = path
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._entries = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, url: str) -> dict | None:
+        """Return {"data": ..., "fetched_on": "YYYY-MM-DD"} for `url`, or None."""
+        return self._entries.get(url)
+
+    def age_days(self, url: str, today: date) -> int | None:
+        entry = self._entries.get(url)
+        if not entry:
+            return None
+        try:
+            return (today - date.fromisoformat(entry["fetched_on"])).days
+        except (KeyError, ValueError):
+            return None
+
+    def put(self, url: str, data: dict, today: date) -> None:
+        with self._lock:
+            self._entries[url] = {"data": data, "fetched_on": today.isoformat()}
+
+    def save(self, today: date) -> None:
+        """Drop entries older than max_age_days and write the store atomically."""
+        cutoff = (today - timedelta(days=self.max_age_days)).isoformat()
+        with self._lock:
+            self._entries = {
+                url: entry for url, entry in self._entries.items()
+                if entry.get("fetched_on", "") >= cutoff
+            }
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,92 @@
+"""
+Scraped event record shared by all venue scrapers, writers and the Supabase sink.
+Events are frozen and slotted: the display fields the scrapers produce, plus the
+parsed date, lowest price and (title, date) key, derived once on construction.
+Parsed dates are shared between events, and prices are kept as integer cents.
+Use dataclasses.replace() to get a modified copy (e.g. with the venue set).
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import date as Date
+
+from cultural_venues_scraper import metrics
+from cultural_venues_scraper.dates import get_parser
+
+# "EUR 14.00", "v.a. EUR 29,00 [UITVERKOCHT]", "Toegang vanaf € 12", "EUR 1.250,00"
+PRICE_RE = re.compile(r"(?:EUR|€)\s*(\d+(?:[.,]\d+)*)", re.IGNORECASE)
+# Amount forms: "1.250,00" / "1,250.00" (thousands groups), "29,00" / "14.00" / "12"
+DUTCH_GROUPED_RE = re.compile(r"\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?")
+ENGLISH_GROUPED_RE = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?")
+PLAIN_AMOUNT_RE = re.compile(r"\d+(?:[.,]\d{1,2})?")
+FREE_RE = re.compile(r"\bgratis\b|\bfree\b", re.IGNORECASE)
+
+# ISO string -> date, so events on the same day share one date object
+_DATES = {}
+
+
+def _amount_cents(amount: str) -> int | None:
+    """Cents of one amount, e.g. 125000 for "1.250,00"; None if its separators are ambiguous."""
+    if DUTCH_GROUPED_RE.fullmatch(amount):
+        amount = amount.replace(".", "").replace(",", ".")
+    elif ENGLISH_GROUPED_RE.fullmatch(amount):
+        amount = amount.replace(",", "")
+    elif PLAIN_AMOUNT_RE.fullmatch(amount):
+        amount = amount.replace(",", ".")
+    else:
+        return None
+    euros, _, cents = amount.partition(".")
+    return int(euros) * 100 + int(cents.ljust(2, "0"))
+
+
+def parse_price(price: str) -> int | None:
+    """
+    Lowest euro amount in a price string, in cents; 0 for free events, None if
+    there is none. Amounts with ambiguous separators are ignored, not guessed.
+    """
+    amounts = [cents for cents in map(_amount_cents, PRICE_RE.findall(price)) if cents is not None]
+    if amounts:
+        return min(amounts)
+    if FREE_RE.search(price):
+        return 0
+    return None
+
+
+def _as_date(iso: str) -> Date:
+    value = _DATES.get(iso)
+    if value is None:
+        value = _DATES.setdefault(iso, Date.fromisoformat(iso))
+    return value
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Event:
+    title: str
+    event_type: str
+    date: str           # as shown on the venue site, e.g. "do 12 feb 2026, 20:15 - 22:20"
+    hall: str
+    description: str
+    url: str
+    price: str = ""     # as shown, e.g. "v.a. EUR 29,00 [Laatste kaarten]"
+    venue: str = ""     # set by scrape_all for combined output
+    event_date: Date | None = field(init=False, repr=False)
+    price_cents: int | None = field(init=False, repr=False)
+    key: tuple[str, str] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        start = time.perf_counter()
+        parsed = get_parser().parse(self.date)[0]
+        metrics.add_time("dates", time.perf_counter() - start)
+        object.__setattr__(self, "event_date", _as_date(parsed) if parsed else None)
+        object.__setattr__(self, "price_cents", parse_price(self.price))
+        # Same normalization as the events table's UNIQUE(event_title, event_date)
+        object.__setattr__(self, "key", (self.title.strip().lower(), parsed or self.date))
+
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
@@ -0,0 +1,153 @@
+"""
+Shared HTTP layer for all venue scrapers.
+One pooled requests.Session (keep-alive per host), common headers,
+and a single place for timeouts and retries. GETs are revalidated against
+the on-disk HttpCache (If-None-Match / If-Modified-Since) when enabled.
+Every request is timed and counted in metrics for the current venue.
+"""
+
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+
+import config
+from cultural_venues_scraper import metrics
+from cultural_venues_scraper.http_cache import HttpCache
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# urllib3 advertises br only when a brotli decoder is installed
+HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"],
+}
+
+TIMEOUT = (config.SCRAPER_CONNECT_TIMEOUT, config.SCRAPER_READ_TIMEOUT)
+
+_session = None
+_session_lock = threading.Lock()
+_limiters = {}
+_limiters_lock = threading.Lock()
+_cache = None
+
+
+class RateLimiter:
+    """Spaces calls to wait() at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def host_limiter(url: str, rate: float) -> RateLimiter:
+    """Return the shared limiter for the host of `url` (rate fixed on first use)."""
+    host = urlparse(url).netloc
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = RateLimiter(rate)
+        return _limiters[host]
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=config.SCRAPER_RETRIES,
+        backoff_factor=config.SCRAPER_RETRY_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # scrapers check status_code themselves
+    )
+    adapter = HTTPAdapter(
+        max_retries=retry,
+        pool_connections=config.SCRAPER_POOL_HOSTS,
+        pool_maxsize=config.SCRAPER_POOL_SIZE,
+    )
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def get_cache() -> HttpCache | None:
+    """Return the shared on-disk response cache, or None if disabled."""
+    global _cache
+    if not config.SCRAPER_HTTP_CACHE:
+        return None
+    if _cache is None:
+        with _session_lock:
+            if _cache is None:
+                _cache = HttpCache(
+                    os.path.join(config.SCRAPER_CACHE_DIR, "http"),
+                    max_bytes=config.SCRAPER_HTTP_CACHE_MAX_MB * 1024 * 1024,
+                    max_age=config.SCRAPER_HTTP_CACHE_MAX_AGE_DAYS * 86400,
+                )
+    return _cache
+
+
+def get(url, params=None, headers=None, timeout=None, rate=None, cache=True, **kwargs) -> requests.Response:
+    """
+    GET through the shared session with the default timeout and retry policy.
+    Pass `rate` (requests/second) to throttle against the host's shared limiter.
+    With `cache`, a stored response is revalidated and a 304 is served from disk
+    (the returned response then has `from_cache = True`).
+    """
+    full_url = requests.Request("GET", url, params=params).prepare().url
+    store = get_cache() if cache else None
+    entry = store.lookup(full_url) if store else None
+    request_headers = dict(headers or {})
+    if entry:
+        request_headers.update(store.validators(entry))
+
+    if rate:
+        with metrics.stage("throttle"):
+            host_limiter(url, rate).wait()
+    try:
+        with metrics.stage("fetch"):
+            r = get_session().get(
+                full_url,
+                headers=request_headers,
+                timeout=timeout or TIMEOUT,
+                **kwargs,
+            )
+    except requests.RequestException:
+        metrics.count(requests=1, errors=1)
+        raise
+    # urllib3 keeps the retries it made on the raw response
+    retries = getattr(getattr(r.raw, "retries", None), "history", None) or ()
+    metrics.count(requests=1, retries=len(retries), bytes=len(r.content))
+
+    if entry and r.status_code == 304:
+        cached = store.revalidated(full_url, entry, r)
+        if cached is not None:
+            metrics.count(cache_hits=1)
+            return cached
+        # Body went missing on disk: fetch unconditionally
+        return get(url, params=params, headers=headers, timeout=timeout, rate=rate, cache=False, **kwargs)
+    if store:
+        store.store(full_url, r)
+    return r
@@ -0,0 +1,58 @@
+"""
+Content fingerprints for events rows.
+content_hash() fingerprints the written columns of a row; FingerprintIndex
+remembers, per (event_title, event_date), the fingerprint last confirmed in
+Supabase so unchanged rows can be skipped without asking the database.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+
+# Columns covered by the fingerprint (the key columns are not part of it)
+HASHED_FIELDS = ("source_name", "source_type", "event_type", "description", "url")
+
+
+def content_hash(row: dict) -> str:
+    payload = "\x1f".join(str(row.get(field) or "") for field in HASHED_FIELDS)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class FingerprintIndex:
+    """Local (event_title, event_date) -> [content_hash, confirmed_on] map, one JSON file."""
+
+    def __init__(self, path: str, max_age_days: int):
+        self.path = path
+        self.max_age_days = max_age_days
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    @staticmethod
+    def _key(title: str, event_date: str) -> str:
+        return f"{event_date}\x1f{title}"
+
+    def is_unchanged(self, title: str, event_date: str, fingerprint: str, today: date) -> bool:
+        """True if this fingerprint was confirmed stored within max_age_days."""
+        entry = self._entries.get(self._key(title, event_date))
+        if not entry or entry[0] != fingerprint:
+            return False
+        return entry[1] >= (today - timedelta(days=self.max_age_days)).isoformat()
+
+    def confirm(self, title: str, event_date: str, fingerprint: str, today: date) -> None:
+        self._entries[self._key(title, event_date)] = [fingerprint, today.isoformat()]
+
+    def save(self, today: date) -> None:
+        """Drop past events and write the index atomically."""
+        past = today.isoformat()
+        self._entries = {k: v for k, v in self._entries.items() if k.split("\x1f", 1)[0] >= past}
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
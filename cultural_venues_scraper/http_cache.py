@@ -0,0 +1,177 @@
+"""
+On-disk HTTP response store for conditional requests.
+Keeps response bodies plus their ETag / Last-Modified validators so the next
+run can revalidate with If-None-Match / If-Modified-Since and serve a 304 from disk.
+Entries older than `max_age` (since last validation) are dropped; the store is
+trimmed least-recently-used first once it grows past `max_bytes`.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Body is stored decoded, so transfer-level headers no longer apply
+_SKIP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class HttpCache:
+    def __init__(self, directory: str, max_bytes: int, max_age: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._total = sum(size for _, size, _ in self._scan())
+        if self._total > self.max_bytes:
+            self.prune()
+
+    # -- paths ---------------------------------------------------------------
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def _scan(self):
+        """Yield (meta_path, entry_bytes, last_used) for every entry."""
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            meta_path = os.path.join(self.directory, name)
+            body_path = meta_path[:-5] + ".body"
+            try:
+                size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+                yield meta_path, size, os.path.getmtime(meta_path)
+            except OSError:
+                continue
+
+    # -- read ----------------------------------------------------------------
+
+    def lookup(self, url: str) -> dict | None:
+        """Return the stored entry for `url`, or None if missing or past max_age."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - meta.get("validated_at", 0) > self.max_age:
+            self._drop(meta_path, body_path)
+            return None
+        return meta
+
+    @staticmethod
+    def validators(entry: dict) -> dict:
+        """Conditional request headers for a stored entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidated(self, url: str, entry: dict, not_modified: requests.Response) -> requests.Response | None:
+        """Build a 200 response from disk after the server answered 304."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except OSError:
+            self._drop(meta_path, body_path)
+            return None
+
+        # A 304 may carry fresher validators; keep them and reset the age clock
+        entry["etag"] = not_modified.headers.get("ETag", entry.get("etag"))
+        entry["last_modified"] = not_modified.headers.get("Last-Modified", entry.get("last_modified"))
+        entry["validated_at"] = time.time()
+        self._write(meta_path, json.dumps(entry).encode("utf-8"))
+
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.reason = "OK"
+        resp.url = url
+        resp.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        resp.encoding = entry.get("encoding")
+        resp.request = not_modified.request
+        resp.elapsed = not_modified.elapsed
+        resp._content = body
+        resp.from_cache = True
+        return resp
+
+    # -- write ---------------------------------------------------------------
+
+    def store(self, url: str, response: requests.Response) -> None:
+        """Store a 200 response if it carries a validator."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "encoding": response.encoding,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS},
+            "validated_at": time.time(),
+        }
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        meta_path, body_path = self._paths(url)
+        old_size = self._entry_size(meta_path, body_path)
+        self._write(body_path, response.content)
+        self._write(meta_path, meta_bytes)  # meta last: it marks the entry complete
+
+        with self._lock:
+            self._total += len(meta_bytes) + len(response.content) - old_size
+            over = self._total > self.max_bytes
+        if over:
+            self.prune()
+
+    def prune(self) -> None:
+        """Drop expired entries, then least-recently-used ones until under 90% of max_bytes."""
+        with self._lock:
+            entries = sorted(self._scan(), key=lambda e: e[2])
+            total = sum(size for _, size, _ in entries)
+            cutoff = time.time() - self.max_age
+            target = self.max_bytes * 0.9
+            for meta_path, size, last_used in entries:
+                if last_used >= cutoff and total <= target:
+                    break
+                self._remove(meta_path, meta_path[:-5] + ".body")
+                total -= size
+            self._total = total
+
+    # -- helpers -------------------------------------------------------------
+
+    @staticmethod
+    def _entry_size(meta_path: str, body_path: str) -> int:
+        try:
+            return os.path.getsize(meta_path) + os.path.getsize(body_path)
+        except OSError:
+            return 0
+
+    def _drop(self, meta_path: str, body_path: str) -> None:
+        """Remove one entry and take its size off the running total."""
+        size = self._entry_size(meta_path, body_path)
+        self._remove(meta_path, body_path)
+        with self._lock:
+            self._total -= size
+
+    def _write(self, path: str, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _remove(*paths: str) -> None:
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
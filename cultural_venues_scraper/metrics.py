@@ -0,0 +1,90 @@
+"""
+Per-venue run metrics: stage timings and HTTP counters.
+The venue being scraped is held in a context variable, so fetch.get(), the
+parsers and the writers record against it without it being passed around;
+work handed to a thread pool keeps the venue when submitted with submit().
+snapshot() is stored in scraper_runs.metrics (migrations/006_scraper_runs_metrics.sql).
+
+Stages overlap: "throttle", "fetch", "parse" and "dates" (Event construction)
+happen while the venue's iter_events() runs, which is timed as "scrape". Times
+of stages run on several threads at once (detail fetches, upsert chunks) are summed.
+"""
+
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+RUN = "run"  # bucket for work outside any venue
+
+_venue = contextvars.ContextVar("metrics_venue", default=RUN)
+_lock = threading.Lock()
+_seconds = defaultdict(lambda: defaultdict(float))  # venue -> stage -> seconds
+_counters = defaultdict(lambda: defaultdict(int))   # venue -> counter -> count
+
+
+def reset() -> None:
+    """Forget everything recorded so far (start of a run)."""
+    with _lock:
+        _seconds.clear()
+        _counters.clear()
+
+
+@contextmanager
+def venue(name: str):
+    """Record everything inside the block (in this context) against `name`."""
+    token = _venue.set(name)
+    try:
+        yield
+    finally:
+        _venue.reset(token)
+
+
+def add_time(stage: str, seconds: float, venue_name: str | None = None) -> None:
+    with _lock:
+        _seconds[venue_name or _venue.get()][stage] += seconds
+
+
+def count(venue_name: str | None = None, **counters: int) -> None:
+    """Add to named counters, e.g. count(requests=1, bytes=len(body))."""
+    with _lock:
+        bucket = _counters[venue_name or _venue.get()]
+        for name, n in counters.items():
+            bucket[name] += n
+
+
+@contextmanager
+def stage(name: str, venue_name: str | None = None):
+    """Time the block as stage `name` of the current venue (or of `venue_name`)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(name, time.perf_counter() - start, venue_name)
+
+
+def submit(pool, fn, *args, **kwargs):
+    """pool.submit() that runs `fn` in a copy of the caller's context, keeping its venue."""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def snapshot() -> dict:
+    """{venue: {"seconds": {stage: seconds}, counter: count, ...}} for everything recorded."""
+    with _lock:
+        return {
+            name: {
+                "seconds": {stage: round(s, 3) for stage, s in sorted(_seconds[name].items())},
+                **dict(sorted(_counters[name].items())),
+            }
+            for name in sorted(set(_seconds) | set(_counters))
+        }
+
+
+def report() -> None:
+    """Print one line per venue: stage times and HTTP counters."""
+    for name, data in snapshot().items():
+        seconds = data.pop("seconds")
+        stages = ", ".join(f"{stage} {s:.2f}s" for stage, s in seconds.items())
+        counters = ", ".join(f"{key} {n}" for key, n in data.items())
+        print(f"  {name}: {'; '.join(part for part in (stages, counters) if part)}")
@@ -5,18 +5,23 @@ Pagination is month-based: /agenda/start/YYYY/MM
 Outputs to events.md and events.csv in this folder.
 """
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 import re
-import csv
 import time
 import os
 from datetime import datetime, timedelta
 
+from cultural_venues_scraper import fetch, metrics
+from cultural_venues_scraper.event import Event
+from cultural_venues_scraper.writers import CsvSink, MarkdownSink, write_all
+from cultural_venues_scraper.parsing import make_soup
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_URL = "https://dezwijger.nl"
 AGENDA_URL = f"{BASE_URL}/agenda"
-HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+# Only the event teasers are parsed
+LISTING_STRAINER = SoupStrainer("div", class_="program teaser")
 
 
 def parse_events_from_page(soup):
@@ -74,22 +79,22 @@ def parse_events_from_page(soup):
 
         url = BASE_URL + href
 
-        events.append({
-            "title": title,
-            "event_type": event_type,
-            "date": date_str,
-            "hall": hall,
-            "description": description,
-            "url": url,
-            "price": price,
-        })
+        events.append(Event(
+            title=title,
+            event_type=event_type,
+            date=date_str,
+            hall=hall,
+            description=description,
+            url=url,
+            price=price,
+        ))
 
     return events
 
 
-def scrape_all_pages():
-    """Scrape all months of the Pakhuis de Zwijger agenda."""
-    all_events = []
+def iter_events():
+    """Yield events from all months of the Pakhuis de Zwijger agenda as each month is parsed."""
+    total = 0
     seen_urls = set()
 
     # Start from current month, go up to 12 months ahead
@@ -108,13 +113,14 @@ def scrape_all_pages():
 
         print(f"Fetching {y}/{m:02d}... ", end="", flush=True)
 
-        r = requests.get(url, headers=HEADERS)
+        r = fetch.get(url)
         if r.status_code != 200:
             print(f"HTTP {r.status_code}, stopping.")
             break
 
-        soup = BeautifulSoup(r.text, "html.parser")
-        events = parse_events_from_page(soup)
+        with metrics.stage("parse"):
+            soup = make_soup(r.text, parse_only=LISTING_STRAINER)
+            events = parse_events_from_page(soup)
 
         if not events:
             print("0 events, stopping.")
@@ -123,46 +129,40 @@ def scrape_all_pages():
         # Deduplicate across months (some events may appear on multiple pages)
         new_events = []
         for e in events:
-            if e["url"] not in seen_urls:
-                seen_urls.add(e["url"])
+            if e.url not in seen_urls:
+                seen_urls.add(e.url)
                 new_events.append(e)
 
-        all_events.extend(new_events)
-        print(f"{len(new_events)} new events (total: {len(all_events)})")
+        total += len(new_events)
+        print(f"{len(new_events)} new events (total: {total})")
+        yield from new_events
 
         time.sleep(0.5)
 
-    return all_events
 
+def scrape_all_pages():
+    """Scrape all months of the Pakhuis de Zwijger agenda."""
+    return list(iter_events())
 
-def write_markdown(events, filename=None):
+
+def markdown_sink(filename=None):
     if filename is None:
         filename = os.path.join(SCRIPT_DIR, "events.md")
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write("# Pakhuis de Zwijger Events\n\n")
-        f.write(f"Source: {AGENDA_URL}\n\n")
-        f.write(f"Total events: {len(events)}\n\n")
-        f.write("| Event Title | Event Type | Date | Hall | Description | URL | Price |\n")
-        f.write("|---|---|---|---|---|---|---|\n")
-        for e in events:
-            desc = (e["description"][:80] + "...") if len(e["description"]) > 80 else e["description"]
-            f.write(
-                f'| {e["title"]} | {e["event_type"]} | {e["date"]} '
-                f'| {e["hall"]} | {desc} | [Link]({e["url"]}) | {e["price"]} |\n'
-            )
-    print(f"Written {filename}")
+    return MarkdownSink(filename, "Pakhuis de Zwijger Events", AGENDA_URL)
 
 
-def write_csv(events, filename=None):
+def csv_sink(filename=None):
     if filename is None:
         filename = os.path.join(SCRIPT_DIR, "events.csv")
-    with open(filename, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f, fieldnames=["title", "event_type", "date", "hall", "description", "url", "price"]
-        )
-        writer.writeheader()
-        writer.writerows(events)
-    print(f"Written {filename}")
+    return CsvSink(filename)
+
+
+def write_markdown(events, filename=None):
+    write_all(markdown_sink(filename), events)
+
+
+def write_csv(events, filename=None):
+    write_all(csv_sink(filename), events)
 
 
 if __name__ == "__main__":
@@ -5,21 +5,28 @@ Paginated listing (25 events per page, offset-based).
 Outputs to events.md and events.csv in this folder.
 """
 
-import requests
 import json
 import re
-import csv
 import os
 import time
 from datetime import datetime
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
+
+from cultural_venues_scraper import fetch, metrics
+from cultural_venues_scraper.event import Event
+from cultural_venues_scraper.writers import CsvSink, MarkdownSink, write_all
+from cultural_venues_scraper.parsing import make_soup
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_URL = "https://www.podiuminfo.nl"
 LISTING_URL = f"{BASE_URL}/podium/2/concerten/Paradiso/Amsterdam/"
-HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
 VENUE_NAME = "Paradiso"
 
+# JSON-LD scripts + the concert row sections (hall names) are all parse_page reads
+LISTING_STRAINER = SoupStrainer(["script", "section"])
+WHITESPACE_RE = re.compile(r"\s+")
+VENUE_SUFFIX_RE = re.compile(r"\s*@\s*Paradiso\s*$")
+
 
 def format_date(iso_str):
     """Convert ISO datetime to readable Dutch-style format."""
@@ -39,30 +46,37 @@ def format_date(iso_str):
         return iso_str
 
 
-def extract_hall_from_html(soup, event_url):
-    """Extract hall name (e.g. Grote Zaal) from the HTML row."""
-    link = soup.find("a", href=event_url)
-    if not link:
-        return ""
-    row = link.find_parent("section", class_="concert_rows_info")
-    if not row:
-        return ""
-    td4 = row.find("div", class_="td_4_1")
-    if td4:
+def build_hall_index(soup):
+    """
+    Map event URL -> hall name (e.g. Grote Zaal) in one pass over the concert rows,
+    so parse_listing() does a dict lookup per event instead of a document scan.
+    """
+    index = {}
+    for row in soup.find_all("section", class_="concert_rows_info"):
+        td4 = row.find("div", class_="td_4_1")
+        if not td4:
+            continue
         # Normalize whitespace (some hall names have extra spaces/newlines)
-        import re as _re
-        return _re.sub(r"\s+", " ", td4.get_text(strip=True))
-    return ""
+        hall = WHITESPACE_RE.sub(" ", td4.get_text(strip=True))
+        for link in row.find_all("a", href=True):
+            index.setdefault(link["href"], hall)
+    return index
 
 
 def parse_page(url):
-    """Parse a single listing page, returning events from JSON-LD."""
-    r = requests.get(url, headers=HEADERS, timeout=15)
+    """Fetch and parse a single listing page, returning events from JSON-LD."""
+    r = fetch.get(url)
     if r.status_code != 200:
         return []
+    with metrics.stage("parse"):
+        return parse_listing(r.text)
 
-    soup = BeautifulSoup(r.text, "html.parser")
+
+def parse_listing(html):
+    """Parse listing page HTML into events (JSON-LD + hall names from the concert rows)."""
+    soup = make_soup(html, parse_only=LISTING_STRAINER)
     ld_scripts = soup.find_all("script", type="application/ld+json")
+    halls = build_hall_index(soup)
 
     events = []
     for script in ld_scripts:
@@ -76,7 +90,7 @@ def parse_page(url):
 
         # Title: strip " @ Paradiso" suffix
         name = data.get("name", "")
-        title = re.sub(r"\s*@\s*Paradiso\s*$", "", name).strip()
+        title = VENUE_SUFFIX_RE.sub("", name).strip()
 
         # Date
         start_date = data.get("startDate", "")
@@ -111,7 +125,7 @@ def parse_page(url):
 
         # Get hall name from HTML (e.g. Grote Zaal, Kleine Zaal)
         event_url = data.get("url", "")
-        hall_name = extract_hall_from_html(soup, event_url)
+        hall_name = halls.get(event_url, "")
         if hall_name:
             location = f"{location} - {hall_name}"
 
@@ -122,22 +136,21 @@ def parse_page(url):
         elif "Postponed" in status:
             price += " [UITGESTELD]" if price != "TBA" else "[UITGESTELD]"
 
-        events.append({
-            "title": title,
-            "event_type": event_type,
-            "date": format_date(start_date),
-            "hall": location,
-            "description": description,
-            "url": event_url,
-            "price": price,
-        })
+        events.append(Event(
+            title=title,
+            event_type=event_type,
+            date=format_date(start_date),
+            hall=location,
+            description=description,
+            url=event_url,
+            price=price,
+        ))
 
     return events
 
 
-def scrape_all_pages():
-    """Fetch all pages of the Paradiso listing on podiuminfo.nl."""
-    all_events = []
+def iter_events():
+    """Yield events from all pages of the Paradiso listing on podiuminfo.nl as each page is parsed."""
     seen_urls = set()
     page = 0
 
@@ -157,12 +170,12 @@ def scrape_all_pages():
         # Deduplicate (pages can overlap by 1 event)
         new_events = []
         for e in events:
-            if e["url"] not in seen_urls:
-                seen_urls.add(e["url"])
+            if e.url not in seen_urls:
+                seen_urls.add(e.url)
                 new_events.append(e)
 
-        all_events.extend(new_events)
         print(f"{len(events)} events ({len(new_events)} new)")
+        yield from new_events
 
         time.sleep(0.5)
         page += 1
@@ -171,37 +184,30 @@ def scrape_all_pages():
         if page > 20:
             break
 
-    return all_events
+
+def scrape_all_pages():
+    """Fetch all pages of the Paradiso listing on podiuminfo.nl."""
+    return list(iter_events())
 
 
-def write_markdown(events, filename=None):
+def markdown_sink(filename=None):
     if filename is None:
         filename = os.path.join(SCRIPT_DIR, "events.md")
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(f"# {VENUE_NAME} Events\n\n")
-        f.write(f"Source: {LISTING_URL}\n\n")
-        f.write(f"Total events: {len(events)}\n\n")
-        f.write("| Event Title | Event Type | Date | Hall | Description | URL | Price |\n")
-        f.write("|---|---|---|---|---|---|---|\n")
-        for e in events:
-            desc = (e["description"][:80] + "...") if len(e["description"]) > 80 else e["description"]
-            f.write(
-                f'| {e["title"]} | {e["event_type"]} | {e["date"]} '
-                f'| {e["hall"]} | {desc} | [Link]({e["url"]}) | {e["price"]} |\n'
-            )
-    print(f"Written {filename}")
+    return MarkdownSink(filename, f"{VENUE_NAME} Events", LISTING_URL)
 
 
-def write_csv(events, filename=None):
+def csv_sink(filename=None):
     if filename is None:
         filename = os.path.join(SCRIPT_DIR, "events.csv")
-    with open(filename, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f, fieldnames=["title", "event_type", "date", "hall", "description", "url", "price"]
-        )
-        writer.writeheader()
-        writer.writerows(events)
-    print(f"Written {filename}")
+    return CsvSink(filename)
+
+
+def write_markdown(events, filename=None):
+    write_all(markdown_sink(filename), events)
+
+
+def write_csv(events, filename=None):
+    write_all(csv_sink(filename), events)
 
 
 if __name__ == "__main__":
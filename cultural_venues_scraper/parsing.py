@@ -0,0 +1,136 @@
+"""
+Shared HTML parsing helpers.
+Uses lxml as the BeautifulSoup tree builder when it is installed (falls back to
+html.parser), and lets each scraper restrict the parse to the elements it
+actually reads with a SoupStrainer. html_to_text() streams a document to
+plain text without building a tree at all.
+"""
+
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+# Strainers shared by several scrapers
+JSON_LD = SoupStrainer("script", type="application/ld+json")
+
+
+def make_soup(markup, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    """Parse HTML with the fastest available builder, optionally only the strained elements."""
+    return BeautifulSoup(markup, PARSER, parse_only=parse_only)
+
+
+class _TextCollector:
+    """
+    Parser target for html_to_text(): collects stripped text nodes in document
+    order, skips <script>/<style> content and emits each http(s) link as a
+    single "link text (href)" line.
+    """
+
+    SKIP = {"script", "style"}
+    VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+    def __init__(self):
+        self.lines = []
+        self._buffer = []
+        self._open = []        # open elements, so an unclosed <a> ends with its parent
+        self._skip = 0
+        self._link = None      # href of the link being collected
+        self._link_level = 0   # len(self._open) when the link started
+        self._link_parts = []
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        text = "".join(self._buffer).strip()
+        self._buffer = []
+        if text:
+            if self._link is not None:
+                self._link_parts.append(text)
+            else:
+                self.lines.append(text)
+
+    def start(self, tag, attrs):
+        self._flush()
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag == "a" and self._link is None:
+            href = dict(attrs).get("href") or ""
+            if href.startswith("http"):
+                self._link = href
+                self._link_level = len(self._open)
+                self._link_parts = []
+        if tag not in self.VOID:
+            self._open.append(tag)
+
+    def end(self, tag):
+        self._flush()
+        if tag in self.SKIP:
+            self._skip = max(self._skip - 1, 0)
+        if tag not in self._open:
+            return  # stray end tag
+        while self._open:
+            if self._open.pop() == tag:
+                break
+        if self._link is not None and len(self._open) <= self._link_level:
+            self._end_link()
+
+    def _end_link(self):
+        self.lines.append(f"{''.join(self._link_parts)} ({self._link})".strip())
+        self._link = None
+
+    def data(self, text):
+        if not self._skip:
+            self._buffer.append(text)
+
+    def comment(self, text):
+        # Comments are not text, but they do end the text node before them
+        self._flush()
+
+    def close(self):
+        self._flush()
+        if self._link is not None:
+            self._end_link()
+        return self.lines
+
+
+class _StdlibTextParser(HTMLParser):
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+    def handle_comment(self, data):
+        self.collector.comment(data)
+
+
+def html_to_text(markup: str) -> str:
+    """
+    Plain text of an HTML document in one streaming pass, without building a tree.
+    Matches get_text(separator="\\n", strip=True) after dropping <script>/<style>
+    and replacing every http(s) <a> with "link text (href)".
+    """
+    collector = _TextCollector()
+    if PARSER == "lxml":
+        parser = etree.HTMLParser(target=collector)
+        parser.feed(markup)
+        lines = parser.close()
+    else:
+        parser = _StdlibTextParser(collector)
+        parser.feed(markup)
+        parser.close()
+        lines = collector.close()
+    return "\n".join(lines)
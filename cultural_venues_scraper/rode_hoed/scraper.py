@@ -5,18 +5,23 @@ Single page with tile cards — no pagination needed.
 Outputs to events.md and events.csv in this folder.
 """
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 import re
-import csv
 import os
 
+from cultural_venues_scraper import fetch, metrics
+from cultural_venues_scraper.event import Event
+from cultural_venues_scraper.writers import CsvSink, MarkdownSink, write_all
+from cultural_venues_scraper.parsing import make_soup
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_URL = "https://rodehoed.nl"
 AGENDA_URL = f"{BASE_URL}/agenda/"
-HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
 VENUE_NAME = "Rode Hoed"
 
+# Only the programme links (each wraps its tile card) are parsed
+LISTING_STRAINER = SoupStrainer("a", href=re.compile(r"/programma/"))
+
 
 def parse_events_from_page(soup):
     """Extract event data from the agenda page."""
@@ -85,62 +90,58 @@ def parse_events_from_page(soup):
         if not price:
             price = "TBA"
 
-        events.append({
-            "title": title,
-            "event_type": event_type,
-            "date": date_str,
-            "hall": VENUE_NAME,
-            "description": description,
-            "url": href,
-            "price": price,
-        })
+        events.append(Event(
+            title=title,
+            event_type=event_type,
+            date=date_str,
+            hall=VENUE_NAME,
+            description=description,
+            url=href,
+            price=price,
+        ))
 
     return events
 
 
+def iter_events():
+    """Yield events from the agenda page (single page, no pagination)."""
+    yield from scrape_all_pages()
+
+
 def scrape_all_pages():
     """Fetch the agenda page (single page, no pagination)."""
     print(f"Fetching {AGENDA_URL}... ", end="", flush=True)
 
-    r = requests.get(AGENDA_URL, headers=HEADERS)
+    r = fetch.get(AGENDA_URL)
     if r.status_code != 200:
         print(f"HTTP {r.status_code}")
         return []
 
-    soup = BeautifulSoup(r.text, "html.parser")
-    events = parse_events_from_page(soup)
+    with metrics.stage("parse"):
+        soup = make_soup(r.text, parse_only=LISTING_STRAINER)
+        events = parse_events_from_page(soup)
     print(f"{len(events)} events")
     return events
 
 
-def write_markdown(events, filename=None):
+def markdown_sink(filename=None):
     if filename is None:
         filename = os.path.join(SCRIPT_DIR, "events.md")
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(f"# {VENUE_NAME} Events\n\n")
-        f.write(f"Source: {AGENDA_URL}\n\n")
-        f.write(f"Total events: {len(events)}\n\n")
-        f.write("| Event Title | Event Type | Date | Hall | Description | URL | Price |\n")
-        f.write("|---|---|---|---|---|---|---|\n")
-        for e in events:
-            desc = (e["description"][:80] + "...") if len(e["description"]) > 80 else e["description"]
-            f.write(
-                f'| {e["title"]} | {e["event_type"]} | {e["date"]} '
-                f'| {e["hall"]} | {desc} | [Link]({e["url"]}) | {e["price"]} |\n'
-            )
-    print(f"Written {filename}")
+    return MarkdownSink(filename, f"{VENUE_NAME} Events", AGENDA_URL)
 
 
-def write_csv(events, filename=None):
+def csv_sink(filename=None):
     if filename is None:
         filename = os.path.join(SCRIPT_DIR, "events.csv")
-    with open(filename, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f, fieldnames=["title", "event_type", "date", "hall", "description", "url", "price"]
-        )
-        writer.writeheader()
-        writer.writerows(events)
-    print(f"Written {filename}")
+    return CsvSink(filename)
+
+
+def write_markdown(events, filename=None):
+    write_all(markdown_sink(filename), events)
+
+
+def write_csv(events, filename=None):
+    write_all(csv_sink(filename), events)
 
 
 if __name__ == "__main__":
@@ -1,18 +1,24 @@
 """
 Run all venue scrapers and produce combined output.
-Usage: python -m cultural_venues_scraper.scrape_all
+Usage: python -m cultural_venues_scraper.scrape_all [--parallel] [--workers N]
    or: python cultural_venues_scraper/scrape_all.py
 """
 
+import argparse
 import csv
 import os
 import importlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 
-from cultural_venues_scraper.supabase_writer import write_to_supabase
+import config
+from cultural_venues_scraper import dates, metrics
+from cultural_venues_scraper.supabase_writer import open_supabase_sink
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Register venue scrapers here — each must have scrape_all_pages(), write_markdown(), write_csv()
+# Register venue scrapers here — each must have iter_events(), scrape_all_pages(),
+# markdown_sink(), csv_sink(), write_markdown(), write_csv()
 VENUES = [
     "concertgebouw",
     "pakhuis_de_zwijger",
@@ -25,44 +31,144 @@ VENUES = [
 ]
 
 
-def run_all():
-    combined = []
+def load_venue(venue):
+    return importlib.import_module(f"cultural_venues_scraper.{venue}.scraper")
 
-    for venue in VENUES:
-        print(f"\n{'='*60}")
-        print(f"  {venue.upper()}")
-        print(f"{'='*60}\n")
 
-        module = importlib.import_module(f"cultural_venues_scraper.{venue}.scraper")
-        events = module.scrape_all_pages()
-        module.write_markdown(events)
-        module.write_csv(events)
+def scrape_venue(venue, module):
+    print(f"\n{'='*60}")
+    print(f"  {venue.upper()}")
+    print(f"{'='*60}\n")
+    with metrics.venue(venue), metrics.stage("scrape"):
+        return module.scrape_all_pages()
 
-        # Tag each event with venue name for combined output
-        for e in events:
-            e["venue"] = venue.replace("_", " ").title()
-        combined.extend(events)
 
-        print(f"  -> {len(events)} events from {venue}")
+def venue_label(venue):
+    return venue.replace("_", " ").title()
 
-    # Write combined CSV
-    combined_csv = os.path.join(SCRIPT_DIR, "all_events.csv")
-    with open(combined_csv, "w", encoding="utf-8", newline="") as f:
+
+def stream_venue(venue, module, sink=None):
+    """
+    Stream one venue's events into its events.md / events.csv and, tagged with
+    the venue name, into `sink` (Supabase) as pages are parsed.
+    Returns (event count, path of the venue CSV). Time spent in the scraper,
+    the file writers and the sink is recorded as stages "scrape", "write" and "sink".
+    """
+    print(f"\n{'='*60}")
+    print(f"  {venue.upper()}")
+    print(f"{'='*60}\n")
+    markdown = module.markdown_sink()
+    table = module.csv_sink()
+    label = venue_label(venue)
+    with metrics.venue(venue):
+        events = module.iter_events()
+        try:
+            while True:
+                with metrics.stage("scrape"):
+                    e = next(events, None)
+                if e is None:
+                    break
+                with metrics.stage("write"):
+                    markdown.write(e)
+                    table.write(e)
+                if sink is not None:
+                    with metrics.stage("sink"):
+                        # Tag each event with venue name for combined output
+                        sink.write(replace(e, venue=label))
+        except BaseException:
+            markdown.discard()
+            table.discard()
+            raise
+        with metrics.stage("write"):
+            markdown.close()
+            table.close()
+        metrics.count(events=table.count)
+    return table.count, table.filename
+
+
+def scrape_parallel(modules, max_workers, job=scrape_venue):
+    """
+    Run `job(venue, module)` (default: scrape_all_pages()) for each venue on a
+    bounded thread pool. Returns {venue: job result}. Every venue is on its own
+    host and pages through it one request at a time; concurrent requests to one
+    host (De Kleine Komedie's detail pages) go through fetch.get(rate=...), whose
+    per-host limiter also covers venues that would share a host.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="venue") as pool:
+        futures = {venue: metrics.submit(pool, job, venue, modules[venue]) for venue in modules}
+        return {venue: fut.result() for venue, fut in futures.items()}
+
+
+def write_combined_csv(venue_csvs, filename):
+    """Concatenate the venue CSVs, in VENUES order, into one CSV with a venue column."""
+    with open(filename, "w", encoding="utf-8", newline="") as f:
         writer = csv.DictWriter(
             f,
             fieldnames=["venue", "title", "event_type", "date", "hall", "description", "url", "price"],
         )
         writer.writeheader()
-        writer.writerows(combined)
+        for venue in VENUES:
+            label = venue_label(venue)
+            with open(venue_csvs[venue], encoding="utf-8", newline="") as src:
+                for row in csv.DictReader(src):
+                    writer.writerow({"venue": label, **row})
+
+
+def run_all(parallel=False, max_workers=None):
+    modules = {venue: load_venue(venue) for venue in VENUES}
+    metrics.reset()
+    # One "today" for the whole run, also if it crosses midnight
+    dates.start_run()
+    # Rows go to Supabase in chunks while the scrapers are still paging
+    sink = open_supabase_sink()
+
+    def job(venue, module):
+        return stream_venue(venue, module, sink)
+
+    try:
+        if parallel:
+            workers = max_workers or config.SCRAPER_WORKERS
+            print(f"Scraping {len(modules)} venue(s) with {workers} worker(s)")
+            results = scrape_parallel(modules, workers, job=job)
+        else:
+            results = {venue: job(venue, module) for venue, module in modules.items()}
+    except Exception as exc:
+        if sink is not None:
+            try:
+                sink.close(error=f"{type(exc).__name__}: {exc}")
+            except RuntimeError:
+                pass
+        raise
+
+    total = 0
+    for venue in VENUES:
+        count = results[venue][0]
+        total += count
+        print(f"  -> {count} events from {venue}")
+
+    # Write combined CSV (stable VENUES order regardless of finish order)
+    combined_csv = os.path.join(SCRIPT_DIR, "all_events.csv")
+    write_combined_csv({venue: path for venue, (_, path) in results.items()}, combined_csv)
+
+    # Finish the Supabase write
+    if sink is not None:
+        sink.close()
 
-    # Write to Supabase
-    write_to_supabase(combined)
-    
     print(f"\n{'='*60}")
-    print(f"Combined: {len(combined)} events from {len(VENUES)} venue(s)")
+    print(f"Combined: {total} events from {len(VENUES)} venue(s)")
     print(f"Written to {combined_csv}")
     print(f"{'='*60}")
+    print("Metrics:")
+    metrics.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all venue scrapers.")
+    parser.add_argument("--parallel", action="store_true", help="scrape venues concurrently")
+    parser.add_argument("--workers", type=int, default=None, help="max venues in flight (with --parallel)")
+    args = parser.parse_args()
+    run_all(parallel=args.parallel, max_workers=args.workers)
 
 
 if __name__ == "__main__":
-    run_all()
+    main()
@@ -3,73 +3,18 @@ Write scraped events to Supabase.
 Maps scraper event format to the events table schema.
 """
 
-import re
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 import config
-
-# Dutch month abbreviations -> month number
-DUTCH_MONTHS = {
-    "jan": 1, "feb": 2, "mrt": 3, "mar": 3, "apr": 4, "mei": 5, "jun": 6,
-    "jul": 7, "aug": 8, "sep": 9, "okt": 10, "oct": 10, "nov": 11, "dec": 12,
-}
-
-
-def parse_event_date(date_str: str) -> str | None:
-    """
-    Parse Dutch date string to YYYY-MM-DD.
-    Supports: "di 10 feb 2026", "10 feb. 2026", "ma 16 feb, 19.30" (year inferred), "Vandaag".
-    Returns None if parsing fails.
-    """
-    if not date_str or not isinstance(date_str, str):
-        return None
-    s = date_str.strip().lower()
-
-    # "Vandaag" / "today" -> today
-    if s.startswith("vandaag") or s == "today":
-        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
-    # Match: DD + month (abbrev or full) + optional dot + optional YYYY
-    # e.g. "do 12 feb 2026", "12 feb. 2026", "ma 16 feb, 19.30", "wo 18 feb, 19.30 uur"
-    m = re.search(r"(\d{1,2})\s+([a-z]{3,9})\.?\s*(?:,|\s+)(\d{4})?", s)
-    if m:
-        day = int(m.group(1))
-        mon_str = m.group(2)[:3]
-        year_str = m.group(3)
-        year = int(year_str) if year_str else None
-        month = DUTCH_MONTHS.get(mon_str)
-        if not month:
-            return None
-        if year is None:
-            now = datetime.now(timezone.utc)
-            year = now.year
-            try:
-                dt = datetime(year, month, day)
-                if dt.date() < now.date():
-                    year += 1
-            except (ValueError, TypeError):
-                pass
-        try:
-            dt = datetime(year, month, day)
-            return dt.strftime("%Y-%m-%d")
-        except (ValueError, TypeError):
-            pass
-
-    # Fallback: DD month YYYY with space (no comma), e.g. "vr 13 februari 2026"
-    m2 = re.search(r"(\d{1,2})\s+([a-z]{3,9})\s+(\d{4})", s)
-    if m2:
-        day = int(m2.group(1))
-        mon_str = m2.group(2)[:3]
-        year = int(m2.group(3))
-        month = DUTCH_MONTHS.get(mon_str)
-        if month:
-            try:
-                dt = datetime(year, month, day)
-                return dt.strftime("%Y-%m-%d")
-            except (ValueError, TypeError):
-                pass
-
-    return None
+from cultural_venues_scraper import metrics
+from cultural_venues_scraper.dates import get_parser, parse_event_date  # noqa: F401 (re-exported)
+from cultural_venues_scraper.event import Event
+from cultural_venues_scraper.fingerprints import FingerprintIndex, content_hash
 
 
 def get_supabase_client():
@@ -80,12 +25,20 @@ def get_supabase_client():
     return create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
 
 
-def _event_key(row: dict) -> tuple[str, str]:
-    """Normalize event key used by current UNIQUE(event_title, event_date)."""
-    return (
-        (row.get("event_title") or "").strip().lower(),
-        row.get("event_date") or "",
-    )
+def _format_reasons(rejected: Counter) -> str:
+    return ", ".join(f"{reason}: {count}" for reason, count in rejected.most_common())
+
+
+UPSERT_CHUNK_SIZE = config.SUPABASE_UPSERT_CHUNK_SIZE
+UPSERT_CONCURRENCY = config.SUPABASE_UPSERT_CONCURRENCY
+UPSERT_RETRIES = config.SUPABASE_UPSERT_RETRIES
+UPSERT_RETRY_BACKOFF = config.SUPABASE_UPSERT_RETRY_BACKOFF
+
+FINGERPRINT_FILE = os.path.join(config.SCRAPER_CACHE_DIR, "fingerprints.json")
+FINGERPRINT_MAX_AGE_DAYS = config.SUPABASE_FINGERPRINT_MAX_AGE_DAYS
+FLUSH_SECONDS = config.SUPABASE_STREAM_FLUSH_SECONDS  # max time a buffered row waits for its chunk
+DIFF_CHUNK_SIZE = 1000      # rows per diff_scraper_events() call
+DIFF_DATES_PER_QUERY = 50   # dates per IN (...) query in the fallback diff
 
 
 def _start_scraper_run(sb):
@@ -105,6 +58,18 @@ def _start_scraper_run(sb):
     return None
 
 
+# scraper_runs columns from migrations/002_scraper_runs.sql
+_BASE_RUN_FIELDS = {
+    "status", "finished_at", "total_scraped", "parsed_rows",
+    "skipped_unparseable_dates", "new_events_estimated", "error_message",
+}
+# scraper_runs columns from later migrations, newest first
+_NEWER_RUN_FIELDS = [
+    {"diff_chunks_failed"},  # migrations/007_scraper_runs_diff_chunks_failed.sql
+    {"metrics"},             # migrations/006_scraper_runs_metrics.sql
+]
+
+
 def _finish_scraper_run(sb, run_id, status, **fields):
     """Update scraper run row. No-op if run logging is unavailable."""
     if not run_id:
@@ -118,136 +83,322 @@ def _finish_scraper_run(sb, run_id, status, **fields):
         sb.table("scraper_runs").update(payload).eq("id", run_id).execute()
     except Exception as exc:
         print(f"WARNING: could not update scraper_runs row: {type(exc).__name__}: {exc}")
+        # Columns from newer migrations may be missing; still record the outcome,
+        # dropping the newest columns one migration at a time, then with the base columns only
+        fallbacks = []
+        dropped = set()
+        for fields in _NEWER_RUN_FIELDS:
+            dropped |= fields
+            fallbacks.append({k: v for k, v in payload.items() if k not in dropped})
+        fallbacks.append({k: v for k, v in payload.items() if k in _BASE_RUN_FIELDS})
+        tried = [payload]
+        for fallback in fallbacks:
+            if fallback in tried:
+                continue
+            tried.append(fallback)
+            try:
+                sb.table("scraper_runs").update(fallback).eq("id", run_id).execute()
+                return
+            except Exception:
+                pass
 
 
-def _fetch_existing_scraper_keys(sb, rows: list[dict]) -> set[tuple[str, str]]:
+MISSING_CONTENT_HASH = "events.content_hash is missing: apply migrations/005_events_content_hash.sql"
+
+
+def _has_content_hash(sb) -> bool:
+    """False if the events table predates migrations/005 (no content_hash column)."""
+    try:
+        sb.table("events").select("content_hash").limit(1).execute()
+    except Exception as exc:
+        if "content_hash" in str(exc):
+            return False
+        # Anything else (e.g. a network error) is left to the chunks and their retries
+        print(f"WARNING: could not check events.content_hash: {type(exc).__name__}: {exc}")
+    return True
+
+
+def _row_key(row: dict) -> tuple[str, str]:
+    """Exact (event_title, event_date) key, as matched by the upsert's ON CONFLICT."""
+    return (row.get("event_title") or "", row.get("event_date") or "")
+
+
+def _diff_via_rpc(sb, rows: list[dict]) -> tuple[set, set]:
+    """Send batch keys + fingerprints to diff_scraper_events(); the database returns only new/changed keys."""
+    new_keys, changed_keys = set(), set()
+    fields = ("event_title", "event_date", "content_hash")
+    for i in range(0, len(rows), DIFF_CHUNK_SIZE):
+        batch = [{f: row.get(f) for f in fields} for row in rows[i:i + DIFF_CHUNK_SIZE]]
+        resp = sb.rpc("diff_scraper_events", {"batch": batch}).execute()
+        for item in getattr(resp, "data", None) or []:
+            key = (item.get("event_title") or "", item.get("event_date") or "")
+            (new_keys if item.get("status") == "new" else changed_keys).add(key)
+    return new_keys, changed_keys
+
+
+def _diff_by_date(sb, rows: list[dict]) -> tuple[set, set]:
+    """Fallback without the RPC: read existing rows only for the dates present in the batch."""
+    dates = sorted({row["event_date"] for row in rows if row.get("event_date")})
+    existing = {}
+    page_size = 1000
+    columns = "event_title,event_date,content_hash"
+
+    for i in range(0, len(dates), DIFF_DATES_PER_QUERY):
+        group = dates[i:i + DIFF_DATES_PER_QUERY]
+        offset = 0
+        while True:
+            resp = (
+                sb.table("events")
+                .select(columns)
+                .in_("event_date", group)
+                .range(offset, offset + page_size - 1)
+                .execute()
+            )
+            data = getattr(resp, "data", None) or []
+            for item in data:
+                existing[_row_key(item)] = item.get("content_hash")
+            if len(data) < page_size:
+                break
+            offset += page_size
+
+    new_keys, changed_keys = set(), set()
+    for row in rows:
+        key = _row_key(row)
+        if key not in existing:
+            new_keys.add(key)
+        elif existing[key] != row["content_hash"]:
+            changed_keys.add(key)
+    return new_keys, changed_keys
+
+
+def _diff_against_existing(sb, rows: list[dict]) -> tuple[set, set]:
     """
-    Fetch existing scraper event keys within the date window for new-event estimation.
-    This estimates new inserts before upsert, based on current UNIQUE(event_title,event_date).
+    Classify batch rows against the events table by exact (event_title, event_date).
+    Returns (new_keys, changed_keys); any other row is already stored unchanged.
     """
     if not rows:
-        return set()
-
-    dates = [r["event_date"] for r in rows if r.get("event_date")]
-    if not dates:
-        return set()
+        return set(), set()
+    try:
+        return _diff_via_rpc(sb, rows)
+    except Exception as exc:
+        print(f"WARNING: diff_scraper_events RPC unavailable ({type(exc).__name__}: {exc}); diffing by date")
+        return _diff_by_date(sb, rows)
 
-    min_date = min(dates)
-    max_date = max(dates)
-    existing = set()
-    page_size = 1000
-    offset = 0
-
-    while True:
-        resp = (
-            sb.table("events")
-            .select("event_title,event_date")
-            .eq("source_type", "scraper")
-            .gte("event_date", min_date)
-            .lte("event_date", max_date)
-            .range(offset, offset + page_size - 1)
-            .execute()
-        )
-        data = getattr(resp, "data", None) or []
-        for item in data:
-            title = (item.get("event_title") or "").strip().lower()
-            event_date = item.get("event_date") or ""
-            if title and event_date:
-                existing.add((title, event_date))
-        if len(data) < page_size:
-            break
-        offset += page_size
 
-    return existing
+def _upsert_chunk(sb, index: int, chunk: list[dict]) -> dict:
+    """Upsert one chunk, retrying with exponential backoff. Returns the chunk outcome."""
+    error = None
+    for attempt in range(1, UPSERT_RETRIES + 1):
+        try:
+            sb.table("events").upsert(chunk, on_conflict="event_title,event_date").execute()
+            return {"chunk": index, "rows": len(chunk), "attempts": attempt, "ok": True}
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            print(f"  WARNING: upsert chunk {index} attempt {attempt}/{UPSERT_RETRIES} failed: {error}")
+            if attempt < UPSERT_RETRIES:
+                time.sleep(UPSERT_RETRY_BACKOFF * 2 ** (attempt - 1))
+    return {"chunk": index, "rows": len(chunk), "attempts": UPSERT_RETRIES, "ok": False, "error": error}
 
 
-def write_to_supabase(events: list[dict]) -> None:
+class SupabaseSink:
     """
-    Upsert scraped events to Supabase events table.
-    Events must have: venue, title, event_type, date, description, url
+    Streaming writer for the events table.
+    write() parses, de-duplicates and fingerprints each event as it arrives and
+    buffers the rows that may need a write; every UPSERT_CHUNK_SIZE rows, or
+    after FLUSH_SECONDS, the buffer is diffed and upserted on a background pool
+    (UPSERT_CONCURRENCY chunks in flight). close() flushes the rest, saves the
+    fingerprints and records the run. Safe to call write() from several threads.
+    Events are written under their `venue`. Raises RuntimeError up front if the
+    events table has no content_hash column.
     """
-    sb = get_supabase_client()
-    if not sb:
-        print("Supabase not configured — skipping write")
-        return
-
-    run_id = _start_scraper_run(sb)
-    rows = []
-    skipped = 0
-    total_scraped = len(events)
 
-    for ev in events:
-        event_date = parse_event_date(ev.get("date", ""))
-        if not event_date:
-            skipped += 1
-            continue
-        rows.append({
-            "source_name": ev.get("venue", ""),
-            "source_type": "scraper",
-            "event_title": ev.get("title", ""),
-            "event_type": ev.get("event_type", ""),
-            "event_date": event_date,
-            "description": ev.get("description", "") or "",
-            "url": ev.get("url", "") or "",
-        })
+    def __init__(self, sb):
+        self.sb = sb
+        self.run_id = _start_scraper_run(sb)
+        # Every diff and upsert sends content_hash; without the column each chunk would fail
+        if not _has_content_hash(sb):
+            _finish_scraper_run(sb, self.run_id, "failed", error_message=MISSING_CONTENT_HASH)
+            raise RuntimeError(MISSING_CONTENT_HASH)
+        self.today = get_parser().today
+        self.fingerprints = FingerprintIndex(FINGERPRINT_FILE, FINGERPRINT_MAX_AGE_DAYS)
+        self.total_scraped = 0
+        self.rejected = Counter()
+        self.duplicates = 0
+        self.unchanged_local = 0
+        self._seen_keys = set()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=UPSERT_CONCURRENCY, thread_name_prefix="upsert")
+        self._futures = []
+
+    def write(self, ev: Event) -> None:
+        with self._lock:
+            self.total_scraped += 1
+            if not ev.event_date:
+                # Only rejected dates are parsed again, to tell why (a parser cache hit)
+                self.rejected[get_parser().parse(ev.date)[1]] += 1
+                return
+            # Deduplicate by (event_title, event_date) so upsert does not see duplicate keys
+            if ev.key in self._seen_keys:
+                self.duplicates += 1
+                return
+            self._seen_keys.add(ev.key)
+            event_date = ev.event_date.isoformat()
+            row = {
+                "source_name": ev.venue,
+                "source_type": "scraper",
+                "event_title": ev.title,
+                "event_type": ev.event_type,
+                "event_date": event_date,
+                "description": ev.description or "",
+                "url": ev.url or "",
+            }
+
+            # Rows whose fingerprint was recently confirmed in Supabase need neither a diff nor a write
+            row["content_hash"] = content_hash(row)
+            if self.fingerprints.is_unchanged(row["event_title"], event_date, row["content_hash"], self.today):
+                self.unchanged_local += 1
+                return
+            self._buffer.append(row)
+            if len(self._buffer) >= UPSERT_CHUNK_SIZE or time.monotonic() - self._last_flush >= FLUSH_SECONDS:
+                self._flush()
+
+    def _flush(self) -> None:
+        """Hand the buffered rows to the pool. Caller holds the lock."""
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        self._futures.append(self._pool.submit(self._write_chunk, len(self._futures), rows))
+
+    def _write_chunk(self, index: int, rows: list[dict]) -> dict:
+        """Diff one chunk against the events table and upsert only its new or changed rows."""
+        try:
+            with metrics.stage("diff", "supabase"):
+                new_keys, changed_keys = _diff_against_existing(self.sb, rows)
+        except Exception as exc:
+            error = f"diff: {type(exc).__name__}: {exc}"
+            print(f"  WARNING: chunk {index} could not be diffed: {error}")
+            return {"chunk": index, "rows": len(rows), "attempts": 0, "ok": False, "error": error,
+                    "new": 0, "modified": 0, "written": 0, "undiffed": len(rows)}
+
+        write_keys = new_keys | changed_keys
+        to_write = [row for row in rows if _row_key(row) in write_keys]
+        if to_write:
+            with metrics.stage("upsert", "supabase"):
+                result = _upsert_chunk(self.sb, index, to_write)
+        else:
+            result = {"chunk": index, "rows": 0, "attempts": 0, "ok": True}
+        result.update(
+            new=len(new_keys), modified=len(changed_keys), written=len(to_write) if result["ok"] else 0, undiffed=0,
+        )
 
-    if not rows:
-        print("No events to write to Supabase (all dates failed to parse or empty)")
+        # Remember what Supabase now holds: rows it reported unchanged, plus the written ones if the upsert succeeded
+        confirmed = rows if result["ok"] else [row for row in rows if _row_key(row) not in write_keys]
+        with self._lock:
+            for row in confirmed:
+                self.fingerprints.confirm(row["event_title"], row["event_date"], row["content_hash"], self.today)
+        return result
+
+    def close(self, error: str | None = None) -> None:
+        """
+        Flush, wait for in-flight chunks and record the run. `error` marks a run
+        whose scraping failed part-way. Raises if every chunk failed.
+        """
+        with self._lock:
+            self._flush()
+        with metrics.stage("wait", "supabase"):
+            results = [f.result() for f in self._futures]
+        self._pool.shutdown()
+        self.fingerprints.save(self.today)
+
+        skipped = sum(self.rejected.values())
+        parsed_rows = len(self._seen_keys)
+        if self.duplicates:
+            print(f"Deduped {self.duplicates} duplicate (title, date) row(s) before upsert")
+
+        failed = [r for r in results if not r["ok"]]
+        # Chunks whose diff failed never reached the upsert; they are counted on their own
+        diff_failed = [r for r in failed if r["undiffed"]]
+        upsert_chunks = [
+            {k: r[k] for k in ("chunk", "rows", "attempts", "ok", "error") if k in r}
+            for r in results if r["attempts"]
+        ]
+        upsert_failed = [r for r in upsert_chunks if not r["ok"]]
+        new_rows = sum(r["new"] for r in results)
+        modified_rows = sum(r["modified"] for r in results)
+        upserted = sum(r["written"] for r in results)
+        to_write = new_rows + modified_rows
+        # Rows of chunks that could not be diffed are unknown, not unchanged
+        undiffed = sum(r["undiffed"] for r in results)
+        unchanged = parsed_rows - to_write - undiffed
+        if parsed_rows:
+            print(f"Upserted {upserted}/{to_write} row(s) to Supabase in {len(upsert_chunks)} chunk(s)")
+            print(
+                f"New events: {new_rows}, modified: {modified_rows}, unchanged (skipped): {unchanged} "
+                f"({self.unchanged_local} from local fingerprints)"
+            )
+            if undiffed:
+                print(f"  {undiffed} row(s) not diffed or written (failed chunks)")
+        else:
+            print("No events to write to Supabase (all dates failed to parse or empty)")
         if skipped:
-            print(f"  Skipped {skipped} event(s) with unparseable dates")
+            print(f"  Skipped {skipped} event(s) with unparseable dates ({_format_reasons(self.rejected)})")
+
+        if error or (failed and len(failed) == len(results)):
+            status = "failed"
+        elif failed:
+            status = "partial"
+        else:
+            status = "completed"
+        errors = [f"chunk {r['chunk']}: {r['error']}" for r in failed]
+        if error:
+            errors.insert(0, error)
+        error_message = "; ".join(errors) or None
+        if failed:
+            print(f"ERROR: {len(failed)} of {len(results)} chunk(s) failed")
+
         _finish_scraper_run(
-            sb,
-            run_id,
-            "completed",
-            total_scraped=total_scraped,
-            parsed_rows=0,
+            self.sb,
+            self.run_id,
+            status,
+            total_scraped=self.total_scraped,
+            parsed_rows=parsed_rows,
             skipped_unparseable_dates=skipped,
-            new_events_estimated=0,
+            new_events_estimated=new_rows,
+            new_rows=new_rows,
+            modified_rows=modified_rows,
+            unchanged_rows=unchanged,
+            upserted_rows=upserted,
+            upsert_chunks_total=len(upsert_chunks),
+            upsert_chunks_failed=len(upsert_failed),
+            upsert_chunks=upsert_chunks,
+            diff_chunks_failed=len(diff_failed),
+            metrics=metrics.snapshot(),
+            error_message=error_message,
         )
-        return
+        if failed and len(failed) == len(results):
+            raise RuntimeError(f"All {len(results)} chunk(s) failed: {error_message}")
 
-    # Deduplicate by (event_title, event_date) so upsert does not see duplicate keys
-    seen_keys = set()
-    unique_rows = []
-    for row in rows:
-        key = _event_key(row)
-        if key in seen_keys:
-            continue
-        seen_keys.add(key)
-        unique_rows.append(row)
-    if len(unique_rows) < len(rows):
-        print(f"Deduped {len(rows) - len(unique_rows)} duplicate (title, date) row(s) before upsert")
 
-    try:
-        existing_keys = _fetch_existing_scraper_keys(sb, unique_rows)
-        new_events_estimated = sum(1 for row in unique_rows if _event_key(row) not in existing_keys)
-
-        sb.table("events").upsert(
-            unique_rows, on_conflict="event_title,event_date"
-        ).execute()
-        print(f"Upserted {len(unique_rows)} row(s) to Supabase")
-        print(f"Estimated new events inserted: {new_events_estimated}")
-        if skipped:
-            print(f"  Skipped {skipped} event(s) with unparseable dates")
+def open_supabase_sink() -> SupabaseSink | None:
+    """Start a streaming write (and scraper run), or None if Supabase is not configured."""
+    sb = get_supabase_client()
+    if not sb:
+        print("Supabase not configured — skipping write")
+        return None
+    return SupabaseSink(sb)
 
-        _finish_scraper_run(
-            sb,
-            run_id,
-            "completed",
-            total_scraped=total_scraped,
-            parsed_rows=len(unique_rows),
-            skipped_unparseable_dates=skipped,
-            new_events_estimated=new_events_estimated,
-        )
-    except Exception as e:
-        print(f"ERROR writing events to Supabase: {type(e).__name__}: {e}")
-        _finish_scraper_run(
-            sb,
-            run_id,
-            "failed",
-            total_scraped=total_scraped,
-            parsed_rows=len(unique_rows),
-            skipped_unparseable_dates=skipped,
-            error_message=str(e),
-        )
-        raise
+
+def write_to_supabase(events) -> None:
+    """
+    Upsert scraped events to Supabase events table.
+    Events are written under their `venue` (see SupabaseSink).
+    """
+    sink = open_supabase_sink()
+    if sink is None:
+        return
+    for ev in events:
+        sink.write(ev)
+    sink.close()
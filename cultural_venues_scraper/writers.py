@@ -0,0 +1,86 @@
+"""
+Streaming event writers.
+Each sink takes events one at a time with write() and finishes the file on
+close(), so a scraper's events never have to be held in a list to be written.
+discard() abandons a sink without touching the previous output file.
+"""
+
+import csv
+import os
+import shutil
+import tempfile
+
+from cultural_venues_scraper.event import Event
+
+FIELDNAMES = ["title", "event_type", "date", "hall", "description", "url", "price"]
+
+
+class CsvSink:
+    """CSV file written to `<filename>.tmp` and moved into place on close()."""
+
+    def __init__(self, filename: str, fieldnames: list[str] = FIELDNAMES):
+        self.filename = filename
+        self._tmp = filename + ".tmp"
+        self._file = open(self._tmp, "w", encoding="utf-8", newline="")
+        self._fields = tuple(fieldnames)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self._fields)
+        self.count = 0
+
+    def write(self, event: Event) -> None:
+        self._writer.writerow([getattr(event, name) for name in self._fields])
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+        os.replace(self._tmp, self.filename)
+        print(f"Written {self.filename}")
+
+    def discard(self) -> None:
+        """Drop what was written and leave the existing file untouched."""
+        self._file.close()
+        os.remove(self._tmp)
+
+
+class MarkdownSink:
+    """
+    Markdown table with a "Total events" line above the rows. Rows are spooled to
+    a temporary file and the final file is assembled on close(), once the total is known.
+    """
+
+    def __init__(self, filename: str, heading: str, source: str):
+        self.filename = filename
+        self.heading = heading
+        self.source = source
+        self.count = 0
+        self._rows = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+
+    def write(self, e: Event) -> None:
+        desc = (e.description[:80] + "...") if len(e.description) > 80 else e.description
+        self._rows.write(
+            f"| {e.title} | {e.event_type} | {e.date} "
+            f"| {e.hall} | {desc} | [Link]({e.url}) | {e.price} |\n"
+        )
+        self.count += 1
+
+    def close(self) -> None:
+        with open(self.filename, "w", encoding="utf-8") as f:
+            f.write(f"# {self.heading}\n\n")
+            f.write(f"Source: {self.source}\n\n")
+            f.write(f"Total events: {self.count}\n\n")
+            f.write("| Event Title | Event Type | Date | Hall | Description | URL | Price |\n")
+            f.write("|---|---|---|---|---|---|---|\n")
+            self._rows.seek(0)
+            shutil.copyfileobj(self._rows, f)
+        self._rows.close()
+        print(f"Written {self.filename}")
+
+    def discard(self) -> None:
+        self._rows.close()
+
+
+def write_all(sink, events) -> None:
+    """Write an iterable of events to a sink and close it."""
+    for e in events:
+        sink.write(e)
+    sink.close()
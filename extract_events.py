@@ -5,22 +5,32 @@ Fetches newsletter emails via Gmail API, extracts events using Claude Haiku,
 and writes results to Google Sheets and optionally Supabase.
 """
 
+import argparse
+import asyncio
 import base64
 import json
 import os
+import random
 import sys
+import time
 from datetime import datetime, timedelta
 
-from bs4 import BeautifulSoup
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 import anthropic
 import gspread
 
 import config
+from cultural_venues_scraper.fingerprints import content_hash
+from cultural_venues_scraper.parsing import html_to_text
+from llm_cache import LLMCache, prompt_version
+from newsletter_text import (
+    DATE_HINT_RE, merge_results, restore_links, shorten_links, split_chunks, strip_boilerplate, strip_repeated,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -58,23 +68,153 @@ def get_google_creds() -> Credentials:
 # Gmail: fetch emails
 # ---------------------------------------------------------------------------
 
-def fetch_emails(service, days: int) -> list[dict]:
-    """Fetch emails from the last `days` days. Returns list of message dicts."""
-    after = (datetime.now() - timedelta(days=days)).strftime("%Y/%m/%d")
-    query = f"in:inbox after:{after}"
-    log(f"Searching Gmail with query: {query}")
+GMAIL_LIST_PAGE_SIZE = 500   # max allowed by messages.list
+GMAIL_BATCH_SIZE = 50        # Gmail recommends <= 50 requests per HTTP batch
 
-    results = service.users().messages().list(userId="me", q=query).execute()
-    messages = results.get("messages", [])
-    log(f"Found {len(messages)} message(s)")
 
-    emails = []
-    for msg_meta in messages:
-        msg = service.users().messages().get(
-            userId="me", id=msg_meta["id"], format="full"
+def list_message_ids(service, query: str) -> list[str]:
+    """List all message IDs matching `query`, following nextPageToken."""
+    ids = []
+    page_token = None
+    while True:
+        results = service.users().messages().list(
+            userId="me", q=query, maxResults=GMAIL_LIST_PAGE_SIZE, pageToken=page_token
         ).execute()
-        emails.append(msg)
-    return emails
+        ids.extend(m["id"] for m in results.get("messages", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            return ids
+
+
+def fetch_messages(service, ids: list[str]) -> list[dict]:
+    """Download full messages with Gmail HTTP batch requests. Returns them in `ids` order."""
+    fetched = {}
+    failed = []
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            failed.append(request_id)
+        else:
+            fetched[request_id] = response
+
+    for i in range(0, len(ids), GMAIL_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=on_response)
+        for msg_id in ids[i:i + GMAIL_BATCH_SIZE]:
+            batch.add(
+                service.users().messages().get(userId="me", id=msg_id, format="full"),
+                request_id=msg_id,
+            )
+        batch.execute()
+
+    # Batches can be partially rate-limited; retry those one by one with backoff
+    for msg_id in failed:
+        try:
+            fetched[msg_id] = service.users().messages().get(
+                userId="me", id=msg_id, format="full"
+            ).execute(num_retries=3)
+        except Exception as e:
+            log(f"WARNING: Could not fetch message {msg_id}: {type(e).__name__}: {e}")
+
+    return [fetched[msg_id] for msg_id in ids if msg_id in fetched]
+
+
+def list_history_message_ids(service, start_history_id: str) -> list[str]:
+    """
+    IDs of messages added to the inbox since `start_history_id`, following nextPageToken.
+    Raises HttpError 404 when that history ID has expired.
+    """
+    ids = []
+    page_token = None
+    while True:
+        results = service.users().history().list(
+            userId="me",
+            startHistoryId=start_history_id,
+            labelId="INBOX",
+            historyTypes=["messageAdded", "labelAdded"],
+            maxResults=GMAIL_LIST_PAGE_SIZE,
+            pageToken=page_token,
+        ).execute()
+        for record in results.get("history", []):
+            for added in record.get("messagesAdded", []):
+                ids.append(added["message"]["id"])
+            for added in record.get("labelsAdded", []):
+                if "INBOX" in added.get("labelIds", []):
+                    ids.append(added["message"]["id"])
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            return list(dict.fromkeys(ids))
+
+
+def load_sync_state() -> dict:
+    """{"history_id": ..., "pending": {gmail_id: first_seen}} from the last run, or {}."""
+    try:
+        with open(config.GMAIL_SYNC_STATE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_sync_state(state: dict) -> None:
+    with open(config.GMAIL_SYNC_STATE_FILE, "w") as f:
+        json.dump(state, f)
+
+
+def list_candidate_ids(service, days: int, processed_lookup) -> list[str]:
+    """
+    IDs of unprocessed inbox messages. With a stored historyId only mail added
+    since the last run is listed (plus earlier mail that is still unprocessed);
+    without one, or once Gmail has expired it, the `days` date window is searched.
+    `processed_lookup(ids)` returns which of `ids` were already processed.
+    """
+    state = {}
+    if config.GMAIL_HISTORY_SYNC:
+        state = load_sync_state()
+        # Snapshot before listing: mail arriving meanwhile is listed again next run
+        history_id = service.users().getProfile(userId="me").execute()["historyId"]
+
+    ids = None
+    if state.get("history_id"):
+        try:
+            ids = list_history_message_ids(service, state["history_id"])
+            log(f"Gmail history since {state['history_id']}: {len(ids)} new message(s)")
+        except HttpError as e:
+            if e.resp.status != 404:
+                raise
+            log("Gmail history ID expired — falling back to date query")
+    if ids is None:
+        after = (datetime.now() - timedelta(days=days)).strftime("%Y/%m/%d")
+        query = f"in:inbox after:{after}"
+        log(f"Searching Gmail with query: {query}")
+        ids = list_message_ids(service, query)
+        log(f"Found {len(ids)} message(s)")
+
+    # Mail listed earlier but not processed yet (e.g. extraction failed) stays a candidate for `days` days
+    today = datetime.now().strftime("%Y-%m-%d")
+    cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    pending = {
+        msg_id: first_seen for msg_id, first_seen in state.get("pending", {}).items()
+        if first_seen >= cutoff
+    }
+    for msg_id in ids:
+        pending.setdefault(msg_id, today)
+    processed = processed_lookup(list(pending))
+    if processed:
+        log(f"Skipping {len(processed)} already-processed message(s)")
+    pending = {msg_id: first_seen for msg_id, first_seen in pending.items() if msg_id not in processed}
+
+    if config.GMAIL_HISTORY_SYNC:
+        save_sync_state({"history_id": history_id, "pending": pending})
+    return list(pending)
+
+
+def fetch_emails(service, days: int, processed_lookup=None) -> list[dict]:
+    """
+    Fetch unprocessed emails (see list_candidate_ids()). Returns list of message dicts.
+    Processed IDs are dropped after listing, before any message body is downloaded.
+    """
+    ids = list_candidate_ids(service, days, processed_lookup or (lambda ids: set()))
+    log(f"{len(ids)} unprocessed message(s) to download")
+    return fetch_messages(service, ids)
 
 
 # ---------------------------------------------------------------------------
@@ -82,50 +222,34 @@ def fetch_emails(service, days: int) -> list[dict]:
 # ---------------------------------------------------------------------------
 
 def extract_text_from_email(msg: dict) -> str:
-    """Walk MIME parts, decode base64, convert HTML to plain text."""
-    parts_to_check = []
-    payload = msg.get("payload", {})
-
-    if "parts" in payload:
-        parts_to_check = payload["parts"]
-    else:
-        parts_to_check = [payload]
-
+    """
+    Walk the MIME tree once and decode only the preferred parts: all text/html
+    parts converted to text (links inlined), else the text/plain parts.
+    """
     html_parts = []
     text_parts = []
+    stack = [msg.get("payload", {})]
+    while stack:
+        part = stack.pop()
+        if "parts" in part:
+            stack.extend(reversed(part["parts"]))
+            continue
+        data = part.get("body", {}).get("data")
+        if not data:
+            continue
+        mime = part.get("mimeType", "")
+        if mime == "text/html":
+            html_parts.append(data)
+        elif mime == "text/plain" and not html_parts:
+            text_parts.append(data)
 
-    def walk_parts(parts: list) -> None:
-        for part in parts:
-            mime = part.get("mimeType", "")
-            if "parts" in part:
-                walk_parts(part["parts"])
-            elif mime == "text/html":
-                data = part.get("body", {}).get("data", "")
-                if data:
-                    html_parts.append(base64.urlsafe_b64decode(data).decode("utf-8", errors="replace"))
-            elif mime == "text/plain":
-                data = part.get("body", {}).get("data", "")
-                if data:
-                    text_parts.append(base64.urlsafe_b64decode(data).decode("utf-8", errors="replace"))
-
-    walk_parts(parts_to_check)
+    def decode(data: str) -> str:
+        return base64.urlsafe_b64decode(data).decode("utf-8", errors="replace")
 
     # Prefer HTML → cleaned text; fall back to plain text
     if html_parts:
-        full_html = "\n".join(html_parts)
-        soup = BeautifulSoup(full_html, "html.parser")
-        # Remove script/style
-        for tag in soup(["script", "style"]):
-            tag.decompose()
-        # Inline href URLs so they survive text extraction
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            link_text = a.get_text(strip=True)
-            if href and href.startswith("http"):
-                a.replace_with(f"{link_text} ({href})")
-        text = soup.get_text(separator="\n", strip=True)
-        return text
-    return "\n".join(text_parts)
+        return html_to_text("\n".join(decode(d) for d in html_parts))
+    return "\n".join(decode(d) for d in text_parts)
 
 
 def get_email_subject(msg: dict) -> str:
@@ -144,6 +268,14 @@ def get_email_sender(msg: dict) -> str:
     return ""
 
 
+def get_email_date(msg: dict) -> str:
+    """Local date (YYYY-MM-DD) Gmail received the message, from its internalDate (epoch ms)."""
+    try:
+        return datetime.fromtimestamp(int(msg["internalDate"]) / 1000).strftime("%Y-%m-%d")
+    except (KeyError, TypeError, ValueError):
+        return datetime.now().strftime("%Y-%m-%d")
+
+
 # ---------------------------------------------------------------------------
 # Deduplication: processed IDs
 # ---------------------------------------------------------------------------
@@ -164,54 +296,114 @@ def save_processed_ids(ids: set) -> None:
 # Claude Haiku: extract events as JSON
 # ---------------------------------------------------------------------------
 
-EXTRACTION_PROMPT_TEMPLATE = """\
+# Static instructions, sent as the system prompt; per-email input (including the
+# email's date) goes in the user message so the prefix is identical on every call.
+# It is not marked for prompt caching: at ~400 tokens it is far below the model's
+# minimum cacheable prompt length, so a cache_control marker would have no effect.
+EXTRACTION_SYSTEM_PROMPT = """\
 You are an event extraction assistant. Given the text of a newsletter email \
 from an Amsterdam cultural venue, extract all events mentioned.
 
 Return ONLY valid JSON (no markdown fences) in this exact format:
-{{
+{
   "source_name": "Name of the venue or newsletter sender",
   "source_type": "newsletter",
   "events": [
-    {{
+    {
       "event_title": "Name of the event / performer",
       "event_type": "concert | cabaret | debate | lecture | film | theater | other",
       "dates_iso": ["2026-01-19", "2026-01-20"],
       "description": "Short description of the event (1-2 sentences)",
       "url": "URL for tickets or event page, if available (otherwise null)"
-    }}
+    }
   ]
-}}
+}
 
 Rules:
 - dates_iso must be ISO 8601 date strings (YYYY-MM-DD). Resolve relative dates \
-using today's date which is {today}.
+against the date the email was sent, which is given at the top of the user message.
 - If a date range is given (e.g. "19 t/m 22 jan"), list each individual date.
+- Long links are abbreviated as placeholders like [link 3]; if an event's URL is \
+one of them, return the placeholder exactly as written.
+- The text may be one part of a longer newsletter; extract the events in this part.
 - If no year is stated, assume the upcoming occurrence of that date.
-- If you cannot determine any events, return {{"source_name": "Unknown", "source_type": "newsletter", "events": []}}.
+- If you cannot determine any events, return {"source_name": "Unknown", "source_type": "newsletter", "events": []}.
 """
 
 
-def extract_events_with_llm(text: str, subject: str) -> dict:
-    """Send email text to Claude Haiku and parse the JSON response."""
-    client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
-    today = datetime.now().strftime("%Y-%m-%d")
+LLM_MODEL = config.LLM_MODEL
+LLM_MAX_TOKENS = 4096
+LLM_RETRYABLE_STATUS = {429, 500, 502, 503, 529}
+
+_client = None
+
+
+def get_anthropic_client() -> anthropic.Anthropic:
+    """Return the shared synchronous Anthropic client."""
+    global _client
+    if _client is None:
+        _client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+    return _client
+
+
+_llm_cache = None
+
+
+def get_llm_cache() -> LLMCache | None:
+    """Shared extraction result cache, or None when LLM_CACHE is off."""
+    global _llm_cache
+    if _llm_cache is None and config.LLM_CACHE:
+        _llm_cache = LLMCache(
+            config.LLM_CACHE_FILE,
+            prompt_version(EXTRACTION_SYSTEM_PROMPT),
+            max_entries=config.LLM_CACHE_MAX_ENTRIES,
+            max_age_days=config.LLM_CACHE_MAX_AGE_DAYS,
+        )
+    return _llm_cache
 
-    response = client.messages.create(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=4096,
-        messages=[
+
+def llm_cache_key(cache: LLMCache, text: str, subject: str, sent_on: str) -> str:
+    # Relative dates ("this Friday") resolve against the email's own date, so the same
+    # email gets the same key on every run
+    return cache.key(LLM_MODEL, sent_on, subject, text[:30000])
+
+
+def build_llm_request(text: str, subject: str, sent_on: str) -> dict:
+    """Keyword arguments for messages.create() for one email sent on `sent_on` (YYYY-MM-DD)."""
+    return {
+        "model": LLM_MODEL,
+        "max_tokens": LLM_MAX_TOKENS,
+        "system": EXTRACTION_SYSTEM_PROMPT,
+        "messages": [
             {
                 "role": "user",
                 "content": (
+                    f"Email date: {sent_on}\n\n"
                     f"Email subject: {subject}\n\n"
-                    f"Email body:\n{text[:30000]}\n\n"
-                    + EXTRACTION_PROMPT_TEMPLATE.format(today=today)
+                    f"Email body:\n{text[:30000]}"
                 ),
             }
         ],
-    )
+    }
+
+
+USAGE_FIELDS = ("input_tokens", "output_tokens")
+
 
+def log_usage(response, subject: str, totals: dict | None = None) -> None:
+    """Log token usage for one call and add it to `totals`."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    counts = {field: getattr(usage, field, None) or 0 for field in USAGE_FIELDS}
+    log(f"  Tokens for '{subject[:60]}': in={counts['input_tokens']} out={counts['output_tokens']}")
+    if totals is not None:
+        for field, value in counts.items():
+            totals[field] = totals.get(field, 0) + value
+
+
+def parse_llm_response(response) -> dict:
+    """Parse the JSON body of a messages.create() response."""
     raw = response.content[0].text.strip()
     # Strip markdown code fences if present
     if raw.startswith("```"):
@@ -223,32 +415,288 @@ def extract_events_with_llm(text: str, subject: str) -> dict:
     return json.loads(raw)
 
 
+def _retry_delay(exc: Exception, attempt: int) -> float | None:
+    """Seconds to wait before retrying `exc`, or None if it is not retryable."""
+    if isinstance(exc, anthropic.APIConnectionError):
+        return min(2 ** attempt, 60)
+    if isinstance(exc, anthropic.APIStatusError) and exc.status_code in LLM_RETRYABLE_STATUS:
+        retry_after = exc.response.headers.get("retry-after") if exc.response is not None else None
+        try:
+            return max(float(retry_after), 1.0)
+        except (TypeError, ValueError):
+            return min(2 ** attempt, 60) + random.uniform(0, 1)
+    return None
+
+
+async def extract_events_with_llm_async(
+    client: anthropic.AsyncAnthropic, text: str, subject: str, sent_on: str, usage: dict | None = None
+) -> dict:
+    """Async extraction with rate-limit-aware retries (honours retry-after on 429/529)."""
+    request = build_llm_request(text, subject, sent_on)
+    for attempt in range(config.LLM_MAX_RETRIES + 1):
+        try:
+            response = await client.messages.create(**request)
+            log_usage(response, subject, usage)
+            return parse_llm_response(response)
+        except (anthropic.APIConnectionError, anthropic.APIStatusError) as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == config.LLM_MAX_RETRIES:
+                raise
+            log(f"  Rate limited / transient error on '{subject[:60]}' ({type(e).__name__}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def extract_all_async(items: list[tuple[str, str, str]], concurrency: int) -> list:
+    """
+    Extract events for (text, subject, sent_on) items with at most `concurrency` calls in flight.
+    Results come back in input order; a failed item yields its exception instead of a dict.
+    """
+    # Retries are handled in extract_events_with_llm_async so they can be logged
+    client = anthropic.AsyncAnthropic(api_key=config.ANTHROPIC_API_KEY, max_retries=0)
+    semaphore = asyncio.Semaphore(concurrency)
+    usage = {}
+
+    async def run(text, subject, sent_on):
+        async with semaphore:
+            return await extract_events_with_llm_async(client, text, subject, sent_on, usage)
+
+    try:
+        return await asyncio.gather(*(run(*item) for item in items), return_exceptions=True)
+    finally:
+        await client.close()
+        if usage:
+            log(f"LLM usage: in={usage['input_tokens']} out={usage['output_tokens']}")
+
+
+class BatchItemError(Exception):
+    """A message batch request that did not succeed (errored, canceled or expired)."""
+
+
+def extract_all_batch(items: list[tuple[str, str, str]], custom_ids: list[str], batches=None) -> list:
+    """
+    Extract events for (text, subject, sent_on) items as one Message Batch and poll until
+    it has ended. `batches` defaults to client.messages.batches; pass an object
+    with the same create/retrieve/results methods to use a local fake.
+    Results come back in input order; a failed item yields an exception.
+    """
+    if batches is None:
+        batches = get_anthropic_client().messages.batches
+    batch = batches.create(requests=[
+        {"custom_id": custom_id, "params": build_llm_request(*item)}
+        for custom_id, item in zip(custom_ids, items)
+    ])
+    log(f"Submitted message batch {batch.id} with {len(items)} request(s)")
+
+    while batch.processing_status != "ended":
+        time.sleep(config.LLM_BATCH_POLL_SECONDS)
+        batch = batches.retrieve(batch.id)
+        counts = batch.request_counts
+        log(f"  Batch {batch.id}: {batch.processing_status} "
+            f"(processing={counts.processing} succeeded={counts.succeeded} errored={counts.errored})")
+
+    subjects = dict(zip(custom_ids, (subject for _, subject, _ in items)))
+    usage = {}
+    by_id = {}
+    for entry in batches.results(batch.id):
+        result = entry.result
+        if result.type != "succeeded":
+            error = getattr(result, "error", None)
+            by_id[entry.custom_id] = BatchItemError(f"{result.type}: {error}" if error else result.type)
+            continue
+        log_usage(result.message, subjects.get(entry.custom_id, entry.custom_id), usage)
+        try:
+            by_id[entry.custom_id] = parse_llm_response(result.message)
+        except json.JSONDecodeError as e:
+            by_id[entry.custom_id] = e
+    if usage:
+        log(f"LLM usage: in={usage['input_tokens']} out={usage['output_tokens']}")
+    return [by_id.get(custom_id, BatchItemError("missing from batch results")) for custom_id in custom_ids]
+
+
+def extract_all(
+    items: list[tuple[str, str, str]],
+    concurrency: int | None = None,
+    custom_ids: list[str] | None = None,
+    batches=None,
+) -> list:
+    """
+    Extract events for (text, subject, sent_on) items, answering repeated inputs from the
+    result cache and sending only the misses to the model: concurrently (see
+    extract_all_async()), or as one Message Batch when `custom_ids` is given.
+    """
+    if not items:
+        return []
+
+    def run(indices):
+        if custom_ids is not None:
+            return extract_all_batch([items[i] for i in indices], [custom_ids[i] for i in indices], batches)
+        return asyncio.run(extract_all_async([items[i] for i in indices], concurrency or config.LLM_CONCURRENCY))
+
+    cache = get_llm_cache()
+    if cache is None:
+        return run(range(len(items)))
+
+    keys = [llm_cache_key(cache, *item) for item in items]
+    results = [cache.get(key) for key in keys]
+    # One model call per distinct missing input, even if it repeats within the run
+    misses = {}
+    for i, result in enumerate(results):
+        if result is None:
+            misses.setdefault(keys[i], i)
+    log(f"LLM cache: {sum(r is not None for r in results)} hit(s), {len(misses)} miss(es)")
+
+    if misses:
+        fresh = run(list(misses.values()))
+        by_key = dict(zip(misses, fresh))
+        for key, result in by_key.items():
+            if not isinstance(result, Exception):
+                cache.put(key, result)
+        results = [by_key[key] if result is None else result for key, result in zip(keys, results)]
+    cache.save()
+    return results
+
+
+def reduce_emails(pending: list[tuple]) -> list[tuple[list[str], dict]]:
+    """
+    Shrink each (msg_id, subject, sender, sent_on, text) email before extraction:
+    strip footer and per-sender repeated boilerplate, shorten long links and
+    split what is still too long. Returns (chunks, link map) per email; an
+    email with no text left gets no chunks and is not sent to the model.
+    """
+    by_sender = {}
+    for _, _, sender, _, text in pending:
+        by_sender.setdefault(sender, []).append(strip_boilerplate(text))
+    by_sender = {sender: iter(texts) for sender, texts in strip_repeated(by_sender).items()}
+
+    reduced = []
+    for _, subject, sender, _, text in pending:
+        short, links = shorten_links(next(by_sender[sender]), config.LLM_LINK_MAX_LEN)
+        if not short.strip():
+            log(f"  '{subject[:60]}': nothing left after removing boilerplate, skipping extraction")
+            reduced.append(([], links))
+            continue
+        chunks, dropped = split_chunks(short, config.LLM_CHUNK_CHARS, config.LLM_MAX_CHUNKS)
+        log(f"  '{subject[:60]}': {len(text)} -> {len(short)} chars, {len(chunks)} chunk(s), {len(links)} link(s) shortened")
+        if dropped:
+            dated = [chunk for chunk in dropped if DATE_HINT_RE.search(chunk)]
+            log(
+                f"    dropped {len(dropped)} chunk(s), {sum(len(c) for c in dropped)} chars: "
+                f"{len(dropped) - len(dated)} without dates, {len(dated)} over LLM_MAX_CHUNKS={config.LLM_MAX_CHUNKS}"
+            )
+        reduced.append((chunks, links))
+    return reduced
+
+
+def chunk_subject(subject: str, index: int, total: int) -> str:
+    return subject if total == 1 else f"{subject} (part {index + 1}/{total})"
+
+
+def extract_emails(pending: list[tuple], batch: bool = False, batches=None) -> list:
+    """
+    Extract events for (msg_id, subject, sender, sent_on, text) emails, chunks in parallel
+    or, with batch=True, as one Message Batch (custom_id "<msg_id>-<chunk>").
+    Returns one merged result per email, or the first exception if any chunk failed.
+    """
+    reduced = reduce_emails(pending)
+    items = []
+    custom_ids = []
+    for (msg_id, subject, _, sent_on, _), (chunks, _) in zip(pending, reduced):
+        items.extend((chunk, chunk_subject(subject, i, len(chunks)), sent_on) for i, chunk in enumerate(chunks))
+        custom_ids.extend(f"{msg_id}-{i}" for i in range(len(chunks)))
+
+    if batch:
+        log(f"Extracting events from {len(pending)} email(s) in {len(items)} request(s) via the Message Batches API...")
+        flat = iter(extract_all(items, custom_ids=custom_ids, batches=batches))
+    else:
+        log(f"Extracting events from {len(pending)} email(s) in {len(items)} call(s), {config.LLM_CONCURRENCY} at a time...")
+        flat = iter(extract_all(items))
+
+    results = []
+    for chunks, links in reduced:
+        parts = [next(flat) for _ in chunks]
+        failed = next((r for r in parts if isinstance(r, Exception)), None)
+        results.append(failed if failed else restore_links(merge_results(parts), links))
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Google Sheets: write events
 # ---------------------------------------------------------------------------
 
+SHEETS_HEADER = ["source_name", "source_type", "event_title", "event_type", "event_date", "description", "url"]
+
+
+def load_sheets_index() -> dict:
+    """Local copy of the sheet's (event_title, event_date) keys and how many rows it covers."""
+    try:
+        with open(config.SHEETS_INDEX_FILE, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    if index.get("sheet_id") != config.GOOGLE_SHEET_ID:
+        index = {"sheet_id": config.GOOGLE_SHEET_ID, "rows": 0, "last_title": None, "keys": []}
+    return index
+
+
+def save_sheets_index(index: dict) -> None:
+    with open(config.SHEETS_INDEX_FILE, "w") as f:
+        json.dump(index, f)
+
+
+def sync_sheets_index(ws, index: dict) -> set:
+    """
+    Bring the index up to date by reading only rows appended since the last sync
+    (columns C:E). Falls back to re-reading the whole sheet when the last synced
+    row no longer matches, e.g. after rows were deleted or sorted by hand.
+    Returns the key set.
+    """
+    keys = {tuple(k) for k in index["keys"]}
+    rows = None
+    if index["rows"]:
+        # Re-read the last synced row as well, to check the sheet still lines up
+        tail = ws.get(f"C{index['rows']}:E")
+        if tail and (tail[0][:1] or [""])[0] == index["last_title"]:
+            rows = tail[1:]
+        else:
+            log("Sheets index out of date — re-reading the whole sheet")
+    if rows is None:
+        keys = set()
+        index["rows"] = 0
+        rows = ws.get("C1:E")
+
+    # The header row ends up as a key too, which never matches a real event
+    for row in rows:
+        keys.add((row[0] if row else "", row[2] if len(row) > 2 else ""))
+    if rows:
+        index["rows"] += len(rows)
+        index["last_title"] = (rows[-1][:1] or [""])[0]
+    return keys
+
+
 def write_to_sheets(creds: Credentials, all_events: list[dict]) -> None:
-    """Append events to Google Sheets, skipping duplicates by event_title."""
+    """Append events to Google Sheets, skipping (event_title, event_date) rows already present."""
     gc = gspread.authorize(creds)
     sh = gc.open_by_key(config.GOOGLE_SHEET_ID)
 
     # Use first worksheet
     ws = sh.sheet1
 
+    index = load_sheets_index()
+    existing = sync_sheets_index(ws, index)
+
     # Ensure header row exists
-    existing = ws.get_all_values()
-    if not existing:
-        ws.append_row(["source_name", "source_type", "event_title", "event_type", "event_date", "description", "url"])
-        existing_titles = set()
-    else:
-        # Column C (index 2) is event_title
-        existing_titles = {row[2] for row in existing[1:] if len(row) > 2}
+    if index["rows"] == 0:
+        ws.append_row(SHEETS_HEADER)
+        index["rows"] = 1
+        index["last_title"] = SHEETS_HEADER[2]
 
     rows_to_add = []
     for ev in all_events:
-        if ev["event_title"] in existing_titles:
-            continue
         for date in ev.get("dates_iso", [""]):
+            key = (ev["event_title"], date or "")
+            if key in existing:
+                continue
+            existing.add(key)
             rows_to_add.append([
                 ev.get("source_name", ""),
                 ev.get("source_type", ""),
@@ -258,14 +706,18 @@ def write_to_sheets(creds: Credentials, all_events: list[dict]) -> None:
                 ev.get("description", ""),
                 ev.get("url", ""),
             ])
-        existing_titles.add(ev["event_title"])
 
     if rows_to_add:
         ws.append_rows(rows_to_add, value_input_option="USER_ENTERED")
+        index["rows"] += len(rows_to_add)
+        index["last_title"] = rows_to_add[-1][2]
         log(f"Wrote {len(rows_to_add)} row(s) to Google Sheets")
     else:
         log("No new rows to write to Google Sheets")
 
+    index["keys"] = sorted(existing)
+    save_sheets_index(index)
+
 
 # ---------------------------------------------------------------------------
 # Supabase: write events
@@ -289,7 +741,7 @@ def write_to_supabase(all_events: list[dict]) -> None:
     rows = []
     for ev in all_events:
         for date in ev.get("dates_iso", [None]):
-            rows.append({
+            row = {
                 "source_name": ev.get("source_name", ""),
                 "source_type": ev.get("source_type", ""),
                 "event_title": ev["event_title"],
@@ -297,44 +749,71 @@ def write_to_supabase(all_events: list[dict]) -> None:
                 "event_date": date,
                 "description": ev.get("description", ""),
                 "url": ev.get("url", ""),
-            })
+            }
+            # Same fingerprint as the venue scraper writes, so its diff sees this row as changed
+            row["content_hash"] = content_hash(row)
+            rows.append(row)
 
     if not rows:
         log("No events to write to Supabase")
         return
 
     try:
-        sb.table("events").upsert(
-            rows, on_conflict="event_title,event_date"
-        ).execute()
+        try:
+            sb.table("events").upsert(rows, on_conflict="event_title,event_date").execute()
+        except Exception as e:
+            if "content_hash" not in str(e):
+                raise
+            # events table predates migrations/005_events_content_hash.sql: write without the fingerprint
+            log("WARNING: events.content_hash is missing (apply migrations/005_events_content_hash.sql); "
+                "writing without it")
+            rows = [{k: v for k, v in row.items() if k != "content_hash"} for row in rows]
+            sb.table("events").upsert(rows, on_conflict="event_title,event_date").execute()
         log(f"Upserted {len(rows)} row(s) to Supabase")
     except Exception as e:
         log(f"ERROR writing events to Supabase: {type(e).__name__}: {e}")
         raise
 
 
-def load_processed_ids_supabase() -> set:
-    """Load processed Gmail IDs from Supabase processed_emails table."""
-    sb = get_supabase_client()
-    if not sb:
-        return set()
-    try:
-        result = sb.table("processed_emails").select("gmail_id").execute()
-        return {row["gmail_id"] for row in result.data}
-    except Exception as e:
-        log(f"WARNING: Could not load processed IDs from Supabase: {e}")
-        return set()
+PROCESSED_LOOKUP_CHUNK = 200   # IDs per .in_() filter, keeps the request URL short
+PROCESSED_UPSERT_CHUNK = 500
 
 
-def save_processed_email(sb, msg_id: str, subject: str, sender: str) -> None:
-    """Record a processed email in Supabase."""
-    try:
-        sb.table("processed_emails").upsert(
-            {"gmail_id": msg_id, "subject": subject, "sender": sender},
-            on_conflict="gmail_id",
-        ).execute()
-    except Exception as e:
-        log(f"WARNING: Could not save processed email {msg_id}: {e}")
+def load_processed_ids_supabase(sb, candidate_ids: list[str]) -> set:
+    """Return which of `candidate_ids` are recorded in Supabase processed_emails."""
+    found = set()
+    for i in range(0, len(candidate_ids), PROCESSED_LOOKUP_CHUNK):
+        chunk = candidate_ids[i:i + PROCESSED_LOOKUP_CHUNK]
+        try:
+            result = sb.table("processed_emails").select("gmail_id").in_("gmail_id", chunk).execute()
+        except Exception as e:
+            log(f"WARNING: Could not load processed IDs from Supabase: {e}")
+            continue
+        found.update(row["gmail_id"] for row in result.data)
+    return found
+
+
+def save_processed_emails(sb, rows: list[tuple[str, str, str]]) -> None:
+    """Record (msg_id, subject, sender) processed emails in Supabase, one upsert per chunk."""
+    for i in range(0, len(rows), PROCESSED_UPSERT_CHUNK):
+        chunk = rows[i:i + PROCESSED_UPSERT_CHUNK]
+        try:
+            sb.table("processed_emails").upsert(
+                [{"gmail_id": msg_id, "subject": subject, "sender": sender} for msg_id, subject, sender in chunk],
+                on_conflict="gmail_id",
+            ).execute()
+        except Exception as e:
+            log(f"WARNING: Could not save {len(chunk)} processed email(s): {e}")
+
+
+def mark_processed(sb, processed_local: set, newly_processed: list[tuple[str, str, str]]) -> None:
+    """Record processed emails locally and in Supabase (if configured)."""
+    if not newly_processed:
+        return
+    processed_local.update(msg_id for msg_id, _, _ in newly_processed)
+    save_processed_ids(processed_local)
+    if sb:
+        save_processed_emails(sb, newly_processed)
 
 
 # ---------------------------------------------------------------------------
@@ -342,6 +821,13 @@ def save_processed_email(sb, msg_id: str, subject: str, sender: str) -> None:
 # ---------------------------------------------------------------------------
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract events from newsletter emails")
+    parser.add_argument(
+        "--batch", action="store_true",
+        help="Submit all pending emails as one Message Batch (cheaper, for backfills; may take a while)",
+    )
+    args = parser.parse_args()
+
     log("=== Amsterdam Culture Event Extractor ===")
 
     if not config.ANTHROPIC_API_KEY:
@@ -353,70 +839,74 @@ def main() -> None:
     creds = get_google_creds()
     gmail = build("gmail", "v1", credentials=creds)
 
-    # 2. Fetch emails
-    emails = fetch_emails(gmail, config.DAYS_LOOKBACK)
-    if not emails:
-        log("No emails found — done")
-        return
-
-    # 3. Load processed IDs (Supabase + local fallback)
+    # 2. Load processed IDs (Supabase + local fallback)
     processed_local = load_processed_ids()
-    processed_supa = load_processed_ids_supabase()
-    processed = processed_local | processed_supa
-
     sb = get_supabase_client()
 
-    # 4. Process each email
+    def processed_lookup(ids: list[str]) -> set:
+        # Only this run's candidates are looked up in Supabase, not the whole table
+        found = {msg_id for msg_id in ids if msg_id in processed_local}
+        unknown = [msg_id for msg_id in ids if msg_id not in found]
+        if sb and unknown:
+            found |= load_processed_ids_supabase(sb, unknown)
+        return found
+
+    # 3. Fetch emails not yet processed
+    emails = fetch_emails(gmail, config.DAYS_LOOKBACK, processed_lookup)
+    if not emails:
+        log("No new emails found — done")
+        return
+
+    # 4. Extract text from each email
     all_events = []
     newly_processed = []  # list of (msg_id, subject, sender)
+    pending = []  # (msg_id, subject, sender, sent_on, text)
 
     for msg in emails:
         msg_id = msg["id"]
-        if msg_id in processed:
-            log(f"Skipping already-processed message {msg_id}")
-            continue
-
         subject = get_email_subject(msg)
         sender = get_email_sender(msg)
         log(f"Processing: {subject} (from {sender})")
 
         try:
             text = extract_text_from_email(msg)
-            if not text.strip():
-                log(f"  No text extracted — skipping")
-                continue
-            log(f"  Extracted {len(text)} chars of text")
+        except Exception as e:
+            log(f"  ERROR processing email: {type(e).__name__}: {e}")
+            continue
+        if not text.strip():
+            log(f"  No text extracted — skipping")
+            continue
+        log(f"  Extracted {len(text)} chars of text")
+        pending.append((msg_id, subject, sender, get_email_date(msg), text))
 
-            # 5. LLM extraction
-            result = extract_events_with_llm(text, subject)
-            events = result.get("events", [])
-            source_name = result.get("source_name", "Unknown")
-            source_type = result.get("source_type", "newsletter")
+    # 5. LLM extraction, concurrently; results come back in email order
+    results = extract_emails(pending, batch=args.batch)
 
-            # Attach source info to each event
-            for ev in events:
-                ev["source_name"] = source_name
-                ev["source_type"] = source_type
+    for (msg_id, subject, sender, _, _), result in zip(pending, results):
+        if isinstance(result, json.JSONDecodeError):
+            log(f"  ERROR: Failed to parse LLM response as JSON for '{subject}': {result}")
+            continue
+        if isinstance(result, Exception):
+            log(f"  ERROR processing email '{subject}': {type(result).__name__}: {result}")
+            continue
 
-            log(f"  Extracted {len(events)} event(s) from {source_name}")
-            all_events.extend(events)
-            newly_processed.append((msg_id, subject, sender))
+        events = result.get("events", [])
+        source_name = result.get("source_name", "Unknown")
+        source_type = result.get("source_type", "newsletter")
 
-        except json.JSONDecodeError as e:
-            log(f"  ERROR: Failed to parse LLM response as JSON: {e}")
-        except Exception as e:
-            log(f"  ERROR processing email: {type(e).__name__}: {e}")
+        # Attach source info to each event
+        for ev in events:
+            ev["source_name"] = source_name
+            ev["source_type"] = source_type
+
+        log(f"  Extracted {len(events)} event(s) from {source_name} ('{subject}')")
+        all_events.extend(events)
+        newly_processed.append((msg_id, subject, sender))
 
     if not all_events:
         log("No new events extracted")
         # Still mark emails as processed even if no events found
-        if newly_processed:
-            ids_set = {mid for mid, _, _ in newly_processed}
-            processed_local.update(ids_set)
-            save_processed_ids(processed_local)
-            if sb:
-                for mid, subj, sndr in newly_processed:
-                    save_processed_email(sb, mid, subj, sndr)
+        mark_processed(sb, processed_local, newly_processed)
         return
 
     log(f"Total new events: {len(all_events)}")
@@ -434,12 +924,7 @@ def main() -> None:
         log(f"ERROR writing to Supabase: {e}")
 
     # 8. Mark as processed (both local + Supabase)
-    ids_set = {mid for mid, _, _ in newly_processed}
-    processed_local.update(ids_set)
-    save_processed_ids(processed_local)
-    if sb:
-        for mid, subj, sndr in newly_processed:
-            save_processed_email(sb, mid, subj, sndr)
+    mark_processed(sb, processed_local, newly_processed)
 
     log("Done!")
 
@@ -0,0 +1,72 @@
+"""
+Content-addressed cache for newsletter extraction results.
+Entries are keyed by a hash of the prompt version, model ID and the exact
+email input, so an identical newsletter (sent to several inboxes, or seen
+again after a failed run) is answered from disk instead of a new model call.
+Changing the prompt changes the version and thereby invalidates every entry.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+def prompt_version(*parts: str) -> str:
+    """Short fingerprint of the prompt text(s); changes whenever the prompt does."""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+class LLMCache:
+    """key -> {"result": ..., "version": ..., "stored_at": epoch seconds}, one JSON file."""
+
+    def __init__(self, path: str, version: str, max_entries: int, max_age_days: int):
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        self._dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def key(self, model: str, *inputs: str) -> str:
+        payload = "\x1f".join((self.version, model) + inputs)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or entry.get("version") != self.version
+            or time.time() - entry.get("stored_at", 0) > self.max_age
+        ):
+            return None
+        return entry["result"]
+
+    def put(self, key: str, result: dict) -> None:
+        self._entries[key] = {"result": result, "version": self.version, "stored_at": time.time()}
+        self._dirty = True
+
+    def save(self) -> None:
+        """Drop stale and old-prompt entries, keep the newest max_entries, write atomically."""
+        cutoff = time.time() - self.max_age
+        fresh = [
+            (k, v) for k, v in self._entries.items()
+            if v.get("version") == self.version and v.get("stored_at", 0) >= cutoff
+        ]
+        if len(fresh) == len(self._entries) and len(fresh) <= self.max_entries and not self._dirty:
+            return
+        fresh.sort(key=lambda kv: kv[1]["stored_at"], reverse=True)
+        self._entries = dict(fresh[: self.max_entries])
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._dirty = False
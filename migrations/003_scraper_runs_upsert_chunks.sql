@@ -0,0 +1,9 @@
+-- Phase 0.2 Schema Migration
+-- Record chunked upsert outcomes on scraper_runs (status may now also be 'partial')
+-- Run this in Supabase SQL Editor after existing migrations.
+
+ALTER TABLE scraper_runs ADD COLUMN IF NOT EXISTS upserted_rows INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE scraper_runs ADD COLUMN IF NOT EXISTS upsert_chunks_total INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE scraper_runs ADD COLUMN IF NOT EXISTS upsert_chunks_failed INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE scraper_runs ADD COLUMN IF NOT EXISTS upsert_chunks JSONB;
+-- upsert_chunks: [{"chunk": 0, "rows": 500, "attempts": 1, "ok": true}, ...]
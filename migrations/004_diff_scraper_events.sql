@@ -0,0 +1,32 @@
+-- Phase 0.3 Schema Migration
+-- Key-targeted diff for the venue scraper: the client sends only its batch
+-- (keys + compared columns) and gets back the rows that are new or changed,
+-- instead of reading every scraper event in the batch's date window.
+-- Run this in Supabase SQL Editor after existing migrations.
+
+CREATE OR REPLACE FUNCTION diff_scraper_events(batch JSONB)
+RETURNS TABLE (event_title TEXT, event_date DATE, status TEXT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT b.event_title,
+           b.event_date,
+           CASE WHEN e.id IS NULL THEN 'new' ELSE 'changed' END
+    FROM jsonb_to_recordset(batch) AS b(
+        event_title TEXT,
+        event_date  DATE,
+        source_name TEXT,
+        source_type TEXT,
+        event_type  TEXT,
+        description TEXT,
+        url         TEXT
+    )
+    LEFT JOIN events e
+           ON e.event_title = b.event_title
+          AND e.event_date = b.event_date
+    WHERE e.id IS NULL
+       OR COALESCE(e.source_name, '') IS DISTINCT FROM COALESCE(b.source_name, '')
+       OR COALESCE(e.source_type, '') IS DISTINCT FROM COALESCE(b.source_type, '')
+       OR COALESCE(e.event_type, '')  IS DISTINCT FROM COALESCE(b.event_type, '')
+       OR COALESCE(e.description, '') IS DISTINCT FROM COALESCE(b.description, '')
+       OR COALESCE(e.url, '')         IS DISTINCT FROM COALESCE(b.url, '');
+$$;
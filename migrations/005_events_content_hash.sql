@@ -0,0 +1,30 @@
+-- Phase 0.4 Schema Migration
+-- Content fingerprints on events so the venue scraper only writes new or modified rows,
+-- plus per-run counts of new / modified / unchanged rows.
+-- Run this in Supabase SQL Editor after existing migrations.
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+ALTER TABLE scraper_runs ADD COLUMN IF NOT EXISTS new_rows INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE scraper_runs ADD COLUMN IF NOT EXISTS modified_rows INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE scraper_runs ADD COLUMN IF NOT EXISTS unchanged_rows INTEGER NOT NULL DEFAULT 0;
+
+-- Diff on the fingerprint instead of comparing every column (replaces 004)
+CREATE OR REPLACE FUNCTION diff_scraper_events(batch JSONB)
+RETURNS TABLE (event_title TEXT, event_date DATE, status TEXT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT b.event_title,
+           b.event_date,
+           CASE WHEN e.id IS NULL THEN 'new' ELSE 'changed' END
+    FROM jsonb_to_recordset(batch) AS b(
+        event_title  TEXT,
+        event_date   DATE,
+        content_hash TEXT
+    )
+    LEFT JOIN events e
+           ON e.event_title = b.event_title
+          AND e.event_date = b.event_date
+    WHERE e.id IS NULL
+       OR e.content_hash IS DISTINCT FROM b.content_hash;
+$$;
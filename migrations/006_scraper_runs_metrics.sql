@@ -0,0 +1,8 @@
+-- Phase 0.5 Schema Migration
+-- Per-venue stage timings and HTTP counters for each scraper run.
+-- Run this in Supabase SQL Editor after existing migrations.
+
+ALTER TABLE scraper_runs ADD COLUMN IF NOT EXISTS metrics JSONB;
+-- metrics: {"concertgebouw": {"seconds": {"fetch": 4.1, "parse": 1.2, "scrape": 6.0, ...},
+--                             "requests": 12, "bytes": 1843210, "cache_hits": 9, "retries": 0, "events": 304},
+--           ..., "supabase": {"seconds": {"diff": 0.8, "upsert": 1.5, "wait": 0.4}}}
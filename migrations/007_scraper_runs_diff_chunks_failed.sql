@@ -0,0 +1,7 @@
+-- Phase 0.6 Schema Migration
+-- Count chunks whose diff failed separately from failed upsert chunks.
+-- Run this in Supabase SQL Editor after existing migrations.
+
+ALTER TABLE scraper_runs ADD COLUMN IF NOT EXISTS diff_chunks_failed INTEGER NOT NULL DEFAULT 0;
+-- upsert_chunks_total / upsert_chunks_failed count only chunks that were upserted;
+-- a chunk that could not be diffed is counted here and was not written
@@ -0,0 +1,165 @@
+"""
+Newsletter text reduction before LLM extraction.
+Drops footer/unsubscribe boilerplate and the header/footer lines a sender
+repeats in every mail, replaces long (tracking) URLs with short [link N]
+placeholders, and splits newsletters that are still too long into chunks that
+can be extracted in parallel and merged afterwards.
+"""
+
+import re
+from collections import Counter
+
+# Lines that are boilerplate on their own (NL + EN newsletter footers)
+BOILERPLATE_RE = re.compile(
+    r"uitschrijven|afmelden|unsubscribe|bekijk (deze|de) (e-?mail|nieuwsbrief)|"
+    r"view (this email )?in (your|je) browser|webversie|web version|"
+    r"je ontvangt deze|u ontvangt deze|you (are receiving|received) this|"
+    r"e-?mailvoorkeuren|email preferences|update (your )?preferences|manage (your )?subscription|"
+    r"privacy ?(statement|verklaring|policy|beleid)|voeg ons toe aan je adresboek|"
+    r"add us to your address book|^©|copyright|alle rechten voorbehouden|all rights reserved",
+    re.IGNORECASE,
+)
+# Only short lines are dropped: a long line mentioning "privacy" may still describe an event
+BOILERPLATE_MAX_LEN = 200
+
+URL_RE = re.compile(r"https?://[^\s()<>\"']+")
+LINK_PLACEHOLDER_RE = re.compile(r"^\[link (\d+)\]$")
+
+# strip_repeated() never shrinks a mail below this many characters
+REPEATED_MIN_CHARS = 200
+
+# Anything that looks like a date; chunks without one rarely contain events
+DATE_HINT_RE = re.compile(
+    r"\b\d{1,2}[-/.]\d{1,2}\b|\b\d{1,2}\s*(jan|feb|mrt|maa|apr|mei|may|jun|jul|aug|sep|okt|oct|nov|dec)|"
+    r"\b(ma|di|wo|do|vr|za|zo)\.?\s+\d|\b(maandag|dinsdag|woensdag|donderdag|vrijdag|zaterdag|zondag|"
+    r"mon|tue|wed|thu|fri|sat|sun|monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"vandaag|morgen|vanavond|today|tonight|tomorrow)\b",
+    re.IGNORECASE,
+)
+
+
+def _norm(line: str) -> str:
+    return " ".join(URL_RE.sub("", line).lower().split())
+
+
+def strip_boilerplate(text: str) -> str:
+    """Drop short lines that match common footer / unsubscribe patterns."""
+    return "\n".join(
+        line for line in text.split("\n")
+        if not (len(line) <= BOILERPLATE_MAX_LEN and BOILERPLATE_RE.search(line))
+    )
+
+
+def _is_content(line: str) -> bool:
+    """Lines that may describe an event: anything with a date or a link."""
+    return bool(DATE_HINT_RE.search(line) or URL_RE.search(line))
+
+
+def strip_repeated(texts_by_sender: dict[str, list[str]]) -> dict[str, list[str]]:
+    """
+    For senders with two or more mails, drop the leading and trailing runs of
+    lines that occur in every one of their mails (mastheads, navigation, footers).
+    Lines with a date or a link are never dropped, since the same event is often
+    announced in consecutive mails, and repeated lines in the middle are kept.
+    A mail that would end up shorter than REPEATED_MIN_CHARS is left as it was.
+    """
+    result = {}
+    for sender, texts in texts_by_sender.items():
+        if len(texts) < 2:
+            result[sender] = texts
+            continue
+        counts = Counter()
+        content = set()
+        for text in texts:
+            lines = text.split("\n")
+            counts.update({_norm(line) for line in lines})
+            content.update(_norm(line) for line in lines if _is_content(line))
+        common = {line for line, n in counts.items() if n == len(texts) and line not in content}
+
+        stripped = []
+        for text in texts:
+            lines = text.split("\n")
+            start, end = 0, len(lines)
+            while start < end and _norm(lines[start]) in common:
+                start += 1
+            while end > start and _norm(lines[end - 1]) in common:
+                end -= 1
+            kept = "\n".join(lines[start:end])
+            stripped.append(kept if len(kept.strip()) >= min(REPEATED_MIN_CHARS, len(text.strip())) else text)
+        result[sender] = stripped
+    return result
+
+
+def shorten_links(text: str, max_len: int) -> tuple[str, dict[str, str]]:
+    """Replace URLs longer than max_len with [link N]; returns (text, placeholder -> URL)."""
+    links = {}
+    by_url = {}
+
+    def replace(m):
+        url = m.group(0)
+        if len(url) <= max_len:
+            return url
+        if url not in by_url:
+            by_url[url] = f"[link {len(by_url) + 1}]"
+            links[by_url[url]] = url
+        return by_url[url]
+
+    return URL_RE.sub(replace, text), links
+
+
+def restore_links(result: dict, links: dict[str, str]) -> dict:
+    """Copy of `result` with the original URLs put back where the model returned a [link N] placeholder."""
+    events = []
+    for ev in result.get("events", []):
+        url = (ev.get("url") or "").strip()
+        if LINK_PLACEHOLDER_RE.match(url):
+            ev = {**ev, "url": links.get(url)}
+        events.append(ev)
+    return {**result, "events": events}
+
+
+def split_chunks(text: str, max_chars: int, max_chunks: int) -> tuple[list[str], list[str]]:
+    """
+    Split text on line boundaries into chunks of at most max_chars; a line
+    longer than that is split across chunks. When there is more than one chunk,
+    chunks without any date-like text are dropped, and at most max_chunks are
+    kept. Returns (kept chunks, dropped chunks) so the caller can report losses.
+    """
+    if len(text) <= max_chars:
+        return [text], []
+    chunks = []
+    current = []
+    size = 0
+    for line in text.split("\n"):
+        for piece in (line[i:i + max_chars] for i in range(0, max(len(line), 1), max_chars)):
+            if current and size + len(piece) + 1 > max_chars:
+                chunks.append("\n".join(current))
+                current = []
+                size = 0
+            current.append(piece)
+            size += len(piece) + 1
+    if current:
+        chunks.append("\n".join(current))
+    dense = [i for i, chunk in enumerate(chunks) if DATE_HINT_RE.search(chunk)] or range(len(chunks))
+    keep = set(dense[:max_chunks])
+    return (
+        [chunk for i, chunk in enumerate(chunks) if i in keep],
+        [chunk for i, chunk in enumerate(chunks) if i not in keep],
+    )
+
+
+def merge_results(results: list[dict]) -> dict:
+    """Merge per-chunk extraction results, de-duplicating events by title + dates."""
+    merged = {"source_name": "Unknown", "source_type": "newsletter", "events": []}
+    seen = set()
+    for result in results:
+        if merged["source_name"] == "Unknown" and result.get("source_name") not in (None, "", "Unknown"):
+            merged["source_name"] = result["source_name"]
+            merged["source_type"] = result.get("source_type") or "newsletter"
+        for ev in result.get("events", []):
+            key = ((ev.get("event_title") or "").strip().lower(), tuple(ev.get("dates_iso") or ()))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged["events"].append(ev)
+    return merged
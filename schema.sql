@@ -11,6 +11,7 @@ CREATE TABLE events (
     event_date      DATE,
     description     TEXT,
     url             TEXT,
+    content_hash    TEXT, -- fingerprint of the written columns (venue scraper)
     created_at      TIMESTAMPTZ DEFAULT NOW(),
     UNIQUE(event_title, event_date)
 );
@@ -50,13 +51,21 @@ CREATE TABLE processed_emails (
 CREATE TABLE scraper_runs (
     id                              UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     source                          TEXT NOT NULL, -- e.g. 'cultural_venues_scraper'
-    status                          TEXT NOT NULL DEFAULT 'running', -- running | completed | failed
+    status                          TEXT NOT NULL DEFAULT 'running', -- running | completed | partial | failed
     started_at                      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     finished_at                     TIMESTAMPTZ,
     total_scraped                   INTEGER NOT NULL DEFAULT 0,
     parsed_rows                     INTEGER NOT NULL DEFAULT 0,
     skipped_unparseable_dates       INTEGER NOT NULL DEFAULT 0,
     new_events_estimated            INTEGER NOT NULL DEFAULT 0,
+    new_rows                        INTEGER NOT NULL DEFAULT 0,
+    modified_rows                   INTEGER NOT NULL DEFAULT 0,
+    unchanged_rows                  INTEGER NOT NULL DEFAULT 0,
+    upserted_rows                   INTEGER NOT NULL DEFAULT 0,
+    upsert_chunks_total             INTEGER NOT NULL DEFAULT 0,
+    upsert_chunks_failed            INTEGER NOT NULL DEFAULT 0,
+    upsert_chunks                   JSONB, -- per-chunk outcome: chunk, rows, attempts, ok, error
+    metrics                         JSONB, -- per-venue stage seconds and HTTP counters (see metrics.py)
     error_message                   TEXT,
     created_at                      TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
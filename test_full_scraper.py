@@ -5,12 +5,15 @@ Test the full scraper with limited events per venue to avoid long runtime
 
 import sys
 import importlib
+from dataclasses import replace
+from itertools import islice
 from pathlib import Path
 
 # Add cultural_venues_scraper to path
 sys.path.insert(0, str(Path(__file__).parent / "cultural_venues_scraper"))
 
-from scrape_all import write_to_supabase, VENUES
+from scrape_all import VENUES
+from supabase_writer import write_to_supabase
 
 def run_limited_test():
     """Run scraper with limited events per venue"""
@@ -23,15 +26,12 @@ def run_limited_test():
         print(f"{'='*60}\n")
 
         module = importlib.import_module(f"cultural_venues_scraper.{venue}.scraper")
-        events = module.scrape_all_pages()
-        
-        # Limit events for testing
-        events = events[:max_events_per_venue]
+        # Limit events for testing; the scraper stops paging once enough are read
+        events = list(islice(module.iter_events(), max_events_per_venue))
         
         # Tag each event with venue name for combined output
-        for e in events:
-            e["venue"] = venue.replace("_", " ").title()
-        combined.extend(events)
+        label = venue.replace("_", " ").title()
+        combined.extend(replace(e, venue=label) for e in events)
 
         print(f"  -> {len(events)} events from {venue} (limited)")
 
@@ -9,7 +9,8 @@ from pathlib import Path
 # Add cultural_venues_scraper to path
 sys.path.insert(0, str(Path(__file__).parent / "cultural_venues_scraper"))
 
-from scrape_all import parse_dutch_date, write_to_supabase
+from scrape_all import parse_dutch_date
+from supabase_writer import write_to_supabase
 
 def test_date_parsing():
     """Test the Dutch date parsing function"""
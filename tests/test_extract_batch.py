@@ -0,0 +1,84 @@
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extract_events
+from extract_events import BatchItemError, extract_all_batch
+
+
+def message(payload):
+    return SimpleNamespace(
+        content=[SimpleNamespace(text=payload)],
+        usage=SimpleNamespace(input_tokens=10, output_tokens=5),
+    )
+
+
+def counts():
+    return SimpleNamespace(processing=0, succeeded=0, errored=0)
+
+
+class FakeBatches:
+    """Stands in for client.messages.batches: ends after `polls` retrieves."""
+
+    def __init__(self, results, polls=2):
+        self.results_by_id = results
+        self.polls = polls
+        self.requests = None
+        self.retrieved = 0
+
+    def create(self, requests):
+        self.requests = requests
+        return SimpleNamespace(id="batch_1", processing_status="in_progress", request_counts=counts())
+
+    def retrieve(self, batch_id):
+        self.retrieved += 1
+        status = "ended" if self.retrieved >= self.polls else "in_progress"
+        return SimpleNamespace(id=batch_id, processing_status=status, request_counts=counts())
+
+    def results(self, batch_id):
+        # The API does not return results in request order
+        for custom_id, result in reversed(list(self.results_by_id.items())):
+            yield SimpleNamespace(custom_id=custom_id, result=result)
+
+
+def succeeded(payload):
+    return SimpleNamespace(type="succeeded", message=message(payload))
+
+
+def test_extract_all_batch_polls_and_maps_results_by_custom_id(monkeypatch):
+    monkeypatch.setattr(extract_events.time, "sleep", lambda seconds: None)
+    batches = FakeBatches({
+        "m1-0": succeeded('{"source_name": "Paradiso", "events": []}'),
+        "m2-0": succeeded('```json\n{"source_name": "De Balie", "events": []}\n```'),
+    })
+    items = [("body one", "First", "2026-01-05"), ("body two", "Second", "2026-01-06")]
+
+    results = extract_all_batch(items, ["m1-0", "m2-0"], batches)
+
+    assert batches.retrieved == 2
+    assert [r["custom_id"] for r in batches.requests] == ["m1-0", "m2-0"]
+    assert "Email date: 2026-01-06" in batches.requests[1]["params"]["messages"][0]["content"]
+    assert [r["source_name"] for r in results] == ["Paradiso", "De Balie"]
+
+
+def test_extract_all_batch_returns_errors_per_item(monkeypatch):
+    monkeypatch.setattr(extract_events.time, "sleep", lambda seconds: None)
+    batches = FakeBatches({
+        "ok": succeeded('{"source_name": "Rode Hoed", "events": []}'),
+        "errored": SimpleNamespace(type="errored", error="overloaded_error"),
+        "expired": SimpleNamespace(type="expired"),
+        "bad-json": succeeded("not json"),
+    }, polls=1)
+    custom_ids = ["ok", "errored", "expired", "bad-json", "missing"]
+    items = [(f"body {i}", f"Subject {i}", "2026-01-05") for i in range(len(custom_ids))]
+
+    ok, errored, expired, bad_json, missing = extract_all_batch(items, custom_ids, batches)
+
+    assert ok["source_name"] == "Rode Hoed"
+    assert isinstance(errored, BatchItemError) and "overloaded_error" in str(errored)
+    assert isinstance(expired, BatchItemError) and "expired" in str(expired)
+    assert isinstance(bad_json, json.JSONDecodeError)
+    assert isinstance(missing, BatchItemError) and "missing" in str(missing)
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from newsletter_text import split_chunks, strip_repeated
+
+MASTHEAD = "Stadsschouwburg Nieuwsbrief"
+FOOTER = "Volg ons op Instagram"
+
+
+def test_strip_repeated_keeps_dated_lines_shared_by_every_mail():
+    first = "\n".join([MASTHEAD, "Hamlet - vr 12 jan, Grote Zaal", "Tickets voor de nieuwe familievoorstelling zijn nu te koop " * 4, FOOTER])
+    second = "\n".join([MASTHEAD, "Hamlet - vr 12 jan, Grote Zaal", "De Gebroeders Karamazov keert terug in het voorjaar " * 4, FOOTER])
+
+    result = strip_repeated({"info@theater.nl": [first, second]})["info@theater.nl"]
+
+    for text in result:
+        assert MASTHEAD not in text
+        assert FOOTER not in text
+        assert "Hamlet - vr 12 jan, Grote Zaal" in text
+
+
+def test_strip_repeated_leaves_identical_mails_intact():
+    mail = "\n".join([MASTHEAD, "Hamlet - vr 12 jan, Grote Zaal", "Een klassieker in een nieuwe regie", FOOTER])
+
+    result = strip_repeated({"info@theater.nl": [mail, mail]})["info@theater.nl"]
+
+    assert result == [mail, mail]
+
+
+def test_split_chunks_splits_overlong_lines_instead_of_cutting_them():
+    line = "za 3 feb " * 40
+
+    kept, dropped = split_chunks(line + "\nkort", max_chars=100, max_chunks=10)
+
+    assert dropped == []
+    assert "".join(kept).replace("\n", "") == line + "kort"
+    assert all(len(chunk) <= 100 for chunk in kept)
+
+
+def test_split_chunks_returns_what_it_drops():
+    text = "\n".join(f"{day} jan concert" for day in range(1, 21))
+
+    kept, dropped = split_chunks(text, max_chars=40, max_chunks=3)
+
+    assert len(kept) == 3
+    assert dropped
+    assert "\n".join(kept + dropped).count("concert") == 20